@@ -1,3 +1,7 @@
+from Opus.core.looplag import install_uvloop
+
+install_uvloop()
+
 from Opus.core.bot import Anony
 from Opus.core.dir import dirr
 from Opus.core.git import git
@@ -7,9 +7,14 @@ from pytgcalls.exceptions import NoActiveGroupCall
 import config
 from Opus import LOGGER, app, userbot
 from Opus.core.call import Anony
+from Opus.core.http import http
+from Opus.core.shard import shard
 from Opus.misc import sudo
 from Opus.plugins import ALL_MODULES
+from Opus.utils.afkdb import load_afk_users
 from Opus.utils.database import get_banned_users, get_gbanned
+from Opus.utils.procpool import procpool
+from Opus.utils.ytdlpool import ytdl
 from config import BANNED_USERS
 
 
@@ -23,6 +28,7 @@ async def init():
     ):
         LOGGER(__name__).error("Assistant client variables not defined, exiting...")
         exit()
+    procpool.start()
     await sudo()
     try:
         users = await get_gbanned()
@@ -33,21 +39,26 @@ async def init():
             BANNED_USERS.add(user_id)
     except:
         pass
+    try:
+        await load_afk_users()
+    except Exception as e:
+        LOGGER("Opus").error(f"Failed to load AFK users: {e}")
     await app.start()
     for all_module in ALL_MODULES:
         importlib.import_module("Opus.plugins" + all_module)
     LOGGER("Opus.plugins").info("Successfully Imported Modules...")
     await userbot.start()
     await Anony.start()
-    try:
-        await Anony.stream_call("https://te.legra.ph/file/29f784eb49d230ab62e9e.mp4")
-    except NoActiveGroupCall:
-        LOGGER("Opus").error(
-            "Please turn on the videochat of your log group\channel.\n\nStopping Bot..."
-        )
-        exit()
-    except:
-        pass
+    if shard.primary:
+        try:
+            await Anony.stream_call("https://te.legra.ph/file/29f784eb49d230ab62e9e.mp4")
+        except NoActiveGroupCall:
+            LOGGER("Opus").error(
+                "Please turn on the videochat of your log group\channel.\n\nStopping Bot..."
+            )
+            exit()
+        except:
+            pass
     await Anony.decorators()
     LOGGER("Opus").info(
         "\x41\x6e\x6f\x6e\x58\x20\x4d\x75\x73\x69\x63\x20\x42\x6f\x74\x20\x53\x74\x61\x72\x74\x65\x64\x20\x53\x75\x63\x63\x65\x73\x73\x66\x75\x6c\x6c\x79\x2e\n\n\x44\x6f\x6e'\x74\x20\x66\x6f\x72\x67\x65\x74\x20\x74\x6f\x20\x76\x69\x73\x69\x74\x20\x40\x46\x61\x6c\x6c\x65\x6e\x41\x73\x73\x6f\x63\x69\x61\x74\x69\x6f\x6e"
@@ -55,6 +66,10 @@ async def init():
     await idle()
     await app.stop()
     await userbot.stop()
+    ytdl.close()
+    procpool.close()
+    await http.close()
+    await shard.close()
     LOGGER("Opus").info("Stopping Opus Music Bot...")
 
 
@@ -4,6 +4,7 @@ from pyrogram import Client, errors
 from pyrogram.enums import ChatMemberStatus, ParseMode
 import config
 from ..logging import LOGGER
+from .ratelimit import get_scheduler
 
 class Anony(Client):
     def __init__(self):
@@ -16,7 +17,12 @@ class Anony(Client):
             in_memory=True,
             parse_mode=ParseMode.HTML,
             max_concurrent_transmissions=7,
+            no_updates=str(config.SHARD_ROLE).lower() == "worker",
         )
+        self.outbound = get_scheduler("Opus", config.OUTBOUND_RATE)
+
+    async def invoke(self, query, *args, **kwargs):
+        return await self.outbound.invoke(super().invoke, query, *args, **kwargs)
 
     async def start(self):
         await super().start()
@@ -1,8 +1,6 @@
 import asyncio
-import os
 from datetime import datetime, timedelta
 from typing import Union
-from pyrogram import Client
 from pyrogram.types import InlineKeyboardMarkup
 from pytgcalls import PyTgCalls
 from pytgcalls.exceptions import (
@@ -11,15 +9,17 @@ from pytgcalls.exceptions import (
 )
 from ntgcalls import TelegramServerError
 from pytgcalls.types import (
-    AudioQuality, 
-    VideoQuality,
     MediaStream,
     Update,
 )
 from pytgcalls.types.stream import StreamAudioEnded
 import config
 from Opus import LOGGER, YouTube, app
+from Opus.core.ratelimit import PLAYBACK, outbound_priority
+from Opus.core.shard import shard
+from Opus.core.userbot import Assistant
 from Opus.misc import db
+from Opus.platforms.Youtube import forget_url
 from Opus.utils.database import (
     add_active_chat,
     add_active_video_chat,
@@ -32,10 +32,22 @@ from Opus.utils.database import (
     remove_active_video_chat,
     set_loop,
 )
+from Opus.utils.assistantjoin import assistant_ready, forget_member
 from Opus.utils.exceptions import AssistantErr
-from Opus.utils.formatters import check_duration, seconds_to_min, speed_converter
+from Opus.utils.formatters import (
+    probe_duration,
+    seconds_to_min,
+    speed_converter,
+    time_to_seconds,
+)
 from Opus.utils.inline.play import stream_markup
 from Opus.utils.stream.autoclear import auto_clean
+from Opus.utils.stream.capacity import capacity
+from Opus.utils.stream.effects import clear_effects, effect_parameters
+from Opus.utils.stream.loudness import track_gain
+from Opus.utils.stream.prefetch import cancel_prefetch, take_prefetched
+from Opus.utils.stream.quality import stream_quality
+from Opus.utils.stream.speed import speed_variant
 from Opus.utils.thumbnails import get_thumb
 from strings import get_string
 
@@ -44,14 +56,17 @@ counter = {}
 loop = asyncio.get_event_loop_policy().get_event_loop()
 
 async def _clear_(chat_id):
+    cancel_prefetch(chat_id)
+    clear_effects(chat_id)
     db[chat_id] = []
     await remove_active_video_chat(chat_id)
     await remove_active_chat(chat_id)
+    capacity.release()
 
 
 class Call(PyTgCalls):
     def __init__(self):
-        self.userbot1 = Client(
+        self.userbot1 = Assistant(
             name="AnonXAss1",
             api_id=config.API_ID,
             api_hash=config.API_HASH,
@@ -61,7 +76,7 @@ class Call(PyTgCalls):
             self.userbot1,
             cache_duration=100,
         )
-        self.userbot2 = Client(
+        self.userbot2 = Assistant(
             name="AnonXAss2",
             api_id=config.API_ID,
             api_hash=config.API_HASH,
@@ -71,7 +86,7 @@ class Call(PyTgCalls):
             self.userbot2,
             cache_duration=100,
         )
-        self.userbot3 = Client(
+        self.userbot3 = Assistant(
             name="AnonXAss3",
             api_id=config.API_ID,
             api_hash=config.API_HASH,
@@ -81,7 +96,7 @@ class Call(PyTgCalls):
             self.userbot3,
             cache_duration=100,
         )
-        self.userbot4 = Client(
+        self.userbot4 = Assistant(
             name="AnonXAss4",
             api_id=config.API_ID,
             api_hash=config.API_HASH,
@@ -91,7 +106,7 @@ class Call(PyTgCalls):
             self.userbot4,
             cache_duration=100,
         )
-        self.userbot5 = Client(
+        self.userbot5 = Assistant(
             name="AnonXAss5",
             api_id=config.API_ID,
             api_hash=config.API_HASH,
@@ -120,27 +135,27 @@ class Call(PyTgCalls):
 
     async def stop_stream_force(self, chat_id: int):
         try:
-            if config.STRING1:
+            if config.STRING1 and shard.runs(1):
                 await self.one.leave_group_call(chat_id)
         except:
             pass
         try:
-            if config.STRING2:
+            if config.STRING2 and shard.runs(2):
                 await self.two.leave_group_call(chat_id)
         except:
             pass
         try:
-            if config.STRING3:
+            if config.STRING3 and shard.runs(3):
                 await self.three.leave_group_call(chat_id)
         except:
             pass
         try:
-            if config.STRING4:
+            if config.STRING4 and shard.runs(4):
                 await self.four.leave_group_call(chat_id)
         except:
             pass
         try:
-            if config.STRING5:
+            if config.STRING5 and shard.runs(5):
                 await self.five.leave_group_call(chat_id)
         except:
             pass
@@ -151,54 +166,41 @@ class Call(PyTgCalls):
 
     async def speedup_stream(self, chat_id: int, file_path, speed, playing):
         assistant = await group_assistant(self, chat_id)
-        if str(speed) != "1.0":
-            base = os.path.basename(file_path)
-            chatdir = os.path.join(os.getcwd(), "playback", str(speed))
-            if not os.path.isdir(chatdir):
-                os.makedirs(chatdir)
-            out = os.path.join(chatdir, base)
-            if not os.path.isfile(out):
-                if str(speed) == "0.5":
-                    vs = 2.0
-                if str(speed) == "0.75":
-                    vs = 1.35
-                if str(speed) == "1.5":
-                    vs = 0.68
-                if str(speed) == "2.0":
-                    vs = 0.5
-                proc = await asyncio.create_subprocess_shell(
-                    cmd=(
-                        "ffmpeg "
-                        "-i "
-                        f"{file_path} "
-                        "-filter:v "
-                        f"setpts={vs}*PTS "
-                        "-filter:a "
-                        f"atempo={speed} "
-                        f"{out}"
-                    ),
-                    stdin=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE,
-                )
-                await proc.communicate()
+        audio_quality, video_quality = await stream_quality(chat_id)
+        video = playing[0]["streamtype"] == "video"
+        if video:
+            out = await speed_variant(file_path, speed)
+            dur = await probe_duration(out)
+            dur = int(dur)
+            played, con_seconds = speed_converter(playing[0]["played"], speed)
+            duration = seconds_to_min(dur)
+            params = effect_parameters(
+                chat_id, params=f"-ss {played} -to {duration}", gain=track_gain(out)
+            )
         else:
+            # Audio keeps the original file and gets a live atempo, so the
+            # seek range is on the original timeline.
             out = file_path
-        dur = await loop.run_in_executor(None, check_duration, out)
-        dur = int(dur)
-        played, con_seconds = speed_converter(playing[0]["played"], speed)
-        duration = seconds_to_min(dur)
+            total = int(playing[0].get("old_second") or playing[0]["seconds"])
+            position = int(playing[0]["played"] * float(playing[0].get("speed") or 1.0))
+            dur = int(total / float(speed))
+            con_seconds = int(position / float(speed))
+            duration = seconds_to_min(dur)
+            params = effect_parameters(
+                chat_id, float(speed), f"-ss {position} -to {total}", track_gain(out)
+            )
         stream = (
             MediaStream(
                 out,
-                audio_parameters=AudioQuality.STUDIO,
-                video_parameters=VideoQuality.SD_480p,
-                ffmpeg_parameters=f"-ss {played} -to {duration}",
+                audio_parameters=audio_quality,
+                video_parameters=video_quality,
+                ffmpeg_parameters=params,
             )
-            if playing[0]["streamtype"] == "video"
+            if video
             else MediaStream(
                 out,
-                audio_parameters=AudioQuality.STUDIO,
-                ffmpeg_parameters=f"-ss {played} -to {duration}",
+                audio_parameters=audio_quality,
+                ffmpeg_parameters=params,
                 video_flags=MediaStream.IGNORE,
             )
         )
@@ -214,9 +216,42 @@ class Call(PyTgCalls):
             db[chat_id][0]["played"] = con_seconds
             db[chat_id][0]["dur"] = duration
             db[chat_id][0]["seconds"] = dur
-            db[chat_id][0]["speed_path"] = out
+            db[chat_id][0]["speed_path"] = out if video else None
             db[chat_id][0]["speed"] = speed
 
+    async def apply_effects(self, chat_id: int):
+        """Restart the current track at its position with the chat's effects."""
+        assistant = await group_assistant(self, chat_id)
+        audio_quality, video_quality = await stream_quality(chat_id)
+        playing = db[chat_id]
+        video = playing[0]["streamtype"] == "video"
+        path = playing[0].get("speed_path") or playing[0]["file"]
+        speed = 1.0
+        total = int(playing[0]["seconds"])
+        if not video and not playing[0].get("speed_path"):
+            speed = float(playing[0].get("speed") or 1.0)
+            total = int(playing[0].get("old_second") or total)
+        position = int(playing[0]["played"] * speed)
+        params = effect_parameters(
+            chat_id, speed, f"-ss {position} -to {total}", track_gain(path)
+        )
+        stream = (
+            MediaStream(
+                path,
+                audio_parameters=audio_quality,
+                video_parameters=video_quality,
+                ffmpeg_parameters=params,
+            )
+            if video
+            else MediaStream(
+                path,
+                audio_parameters=audio_quality,
+                ffmpeg_parameters=params,
+                video_flags=MediaStream.IGNORE,
+            )
+        )
+        await assistant.change_stream(chat_id, stream)
+
     async def force_stop_stream(self, chat_id: int):
         assistant = await group_assistant(self, chat_id)
         try:
@@ -239,16 +274,19 @@ class Call(PyTgCalls):
         image: Union[bool, str] = None,
     ):
         assistant = await group_assistant(self, chat_id)
+        audio_quality, video_quality = await stream_quality(chat_id)
         if video:
             stream = MediaStream(
                 link,
-                AudioQuality.STUDIO,
-                VideoQuality.SD_480p,
+                audio_quality,
+                video_quality,
+                ffmpeg_parameters=effect_parameters(chat_id, gain=track_gain(link)),
             )
         else:
             stream = MediaStream(
-                link, 
-                AudioQuality.STUDIO,
+                link,
+                audio_quality,
+                ffmpeg_parameters=effect_parameters(chat_id, gain=track_gain(link)),
             )
         await assistant.change_stream(
             chat_id,
@@ -257,18 +295,30 @@ class Call(PyTgCalls):
 
     async def seek_stream(self, chat_id, file_path, to_seek, duration, mode):
         assistant = await group_assistant(self, chat_id)
+        audio_quality, video_quality = await stream_quality(chat_id)
+        speed = 1.0
+        playing = db.get(chat_id)
+        if mode != "video" and playing and not playing[0].get("speed_path"):
+            speed = float(playing[0].get("speed") or 1.0)
+        if speed != 1.0:
+            # Live atempo: seek on the untouched file's own timeline.
+            to_seek = int(time_to_seconds(to_seek) * speed)
+            duration = int(playing[0].get("old_second") or playing[0]["seconds"])
+        params = effect_parameters(
+            chat_id, speed, f"-ss {to_seek} -to {duration}", track_gain(file_path)
+        )
         stream = (
             MediaStream(
                 file_path,
-                audio_parameters=AudioQuality.STUDIO,
-                video_parameters=VideoQuality.SD_480p,
-                ffmpeg_parameters=f"-ss {to_seek} -to {duration}",
+                audio_parameters=audio_quality,
+                video_parameters=video_quality,
+                ffmpeg_parameters=params,
             )
             if mode == "video"
             else MediaStream(
                 file_path,
-                audio_parameters=AudioQuality.STUDIO,
-                ffmpeg_parameters=f"-ss {to_seek} -to {duration}",
+                audio_parameters=audio_quality,
+                ffmpeg_parameters=params,
                 video_flags=MediaStream.IGNORE,
             )
         )
@@ -291,26 +341,31 @@ class Call(PyTgCalls):
         video: Union[bool, str] = None,
         image: Union[bool, str] = None,
     ):
+        await assistant_ready(chat_id)
         assistant = await group_assistant(self, chat_id)
+        audio_quality, video_quality = await stream_quality(chat_id)
         language = await get_lang(chat_id)
         _ = get_string(language)
         if video:
             stream = MediaStream(
                 link,
-                AudioQuality.STUDIO,
-                VideoQuality.SD_480p,
+                audio_quality,
+                video_quality,
+                ffmpeg_parameters=effect_parameters(chat_id, gain=track_gain(link)),
             )
         else:
             stream = (
                 MediaStream(
                     link,
-                    AudioQuality.STUDIO,
-                    VideoQuality.SD_480p,
+                    audio_quality,
+                    video_quality,
+                    ffmpeg_parameters=effect_parameters(chat_id, gain=track_gain(link)),
                 )
                 if video
                 else MediaStream(
-                    link, 
-                    AudioQuality.STUDIO,
+                    link,
+                    audio_quality,
+                    ffmpeg_parameters=effect_parameters(chat_id, gain=track_gain(link)),
                 )
             )
         try:
@@ -370,6 +425,7 @@ class Call(PyTgCalls):
                 db[chat_id][0]["speed_path"] = None
                 db[chat_id][0]["speed"] = 1.0
             video = str(streamtype) == "video"
+            audio_quality, video_quality = await stream_quality(chat_id)
             if "live_" in queued:
                 n, link = await YouTube.video(videoid, True)
                 if n == 0:
@@ -380,17 +436,20 @@ class Call(PyTgCalls):
                 if video:
                     stream = MediaStream(
                         link,
-                        AudioQuality.STUDIO,
-                        VideoQuality.SD_480p,
+                        audio_quality,
+                        video_quality,
+                        ffmpeg_parameters=effect_parameters(chat_id, gain=track_gain(link)),
                     )
                 else:
                     stream = MediaStream(
                         link,
-                        AudioQuality.STUDIO,
+                        audio_quality,
+                        ffmpeg_parameters=effect_parameters(chat_id, gain=track_gain(link)),
                     )
                 try:
                     await client.change_stream(chat_id, stream)
                 except Exception:
+                    forget_url(YouTube.base + videoid)
                     return await app.send_message(
                         original_chat_id,
                         text=_["call_6"],
@@ -411,28 +470,33 @@ class Call(PyTgCalls):
                 db[chat_id][0]["mystic"] = run
                 db[chat_id][0]["markup"] = "tg"
             elif "vid_" in queued:
-                mystic = await app.send_message(original_chat_id, _["call_7"])
-                try:
-                    file_path, direct = await YouTube.download(
-                        videoid,
-                        mystic,
-                        videoid=True,
-                        video=str(streamtype) == "video",
-                    )
-                except:
-                    return await mystic.edit_text(
-                        _["call_6"], disable_web_page_preview=True
-                    )
+                mystic = None
+                file_path = await take_prefetched(chat_id, videoid, video)
+                if not file_path:
+                    mystic = await app.send_message(original_chat_id, _["call_7"])
+                    try:
+                        file_path, direct = await YouTube.download(
+                            videoid,
+                            mystic,
+                            videoid=True,
+                            video=str(streamtype) == "video",
+                        )
+                    except:
+                        return await mystic.edit_text(
+                            _["call_6"], disable_web_page_preview=True
+                        )
                 if video:
                     stream = MediaStream(
                         file_path,
-                        AudioQuality.STUDIO,
-                        VideoQuality.SD_480p,
+                        audio_quality,
+                        video_quality,
+                        ffmpeg_parameters=effect_parameters(chat_id, gain=track_gain(file_path)),
                     )
                 else:
                     stream = MediaStream(
                         file_path,
-                        AudioQuality.STUDIO,
+                        audio_quality,
+                        ffmpeg_parameters=effect_parameters(chat_id, gain=track_gain(file_path)),
                     )
                 try:
                     await client.change_stream(chat_id, stream)
@@ -443,7 +507,8 @@ class Call(PyTgCalls):
                     )
                 img = await get_thumb(videoid)
                 button = stream_markup(_, chat_id)
-                await mystic.delete()
+                if mystic:
+                    await mystic.delete()
                 run = await app.send_photo(
                     chat_id=original_chat_id,
                     photo=img,
@@ -461,13 +526,15 @@ class Call(PyTgCalls):
                 stream = (
                     MediaStream(
                         videoid,
-                        AudioQuality.STUDIO,
-                        VideoQuality.SD_480p,
+                        audio_quality,
+                        video_quality,
+                        ffmpeg_parameters=effect_parameters(chat_id, gain=track_gain(videoid)),
                     )
                     if str(streamtype) == "video"
                     else MediaStream(
-                        videoid, 
-                        AudioQuality.STUDIO,
+                        videoid,
+                        audio_quality,
+                        ffmpeg_parameters=effect_parameters(chat_id, gain=track_gain(videoid)),
                     )
                 )
                 try:
@@ -490,13 +557,15 @@ class Call(PyTgCalls):
                 if video:
                     stream = MediaStream(
                         queued,
-                        AudioQuality.STUDIO,
-                        VideoQuality.SD_480p,
+                        audio_quality,
+                        video_quality,
+                        ffmpeg_parameters=effect_parameters(chat_id, gain=track_gain(queued)),
                     )
                 else:
                     stream = MediaStream(
                         queued,
-                        AudioQuality.STUDIO,
+                        audio_quality,
+                        ffmpeg_parameters=effect_parameters(chat_id, gain=track_gain(queued)),
                     )
                 try:
                     await client.change_stream(chat_id, stream)
@@ -550,29 +619,29 @@ class Call(PyTgCalls):
 
     async def ping(self):
         pings = []
-        if config.STRING1:
+        if config.STRING1 and shard.runs(1):
             pings.append(await self.one.ping)
-        if config.STRING2:
+        if config.STRING2 and shard.runs(2):
             pings.append(await self.two.ping)
-        if config.STRING3:
+        if config.STRING3 and shard.runs(3):
             pings.append(await self.three.ping)
-        if config.STRING4:
+        if config.STRING4 and shard.runs(4):
             pings.append(await self.four.ping)
-        if config.STRING5:
+        if config.STRING5 and shard.runs(5):
             pings.append(await self.five.ping)
         return str(round(sum(pings) / len(pings), 3))
 
     async def start(self):
         LOGGER(__name__).info("Starting PyTgCalls Client...\n")
-        if config.STRING1:
+        if config.STRING1 and shard.runs(1):
             await self.one.start()
-        if config.STRING2:
+        if config.STRING2 and shard.runs(2):
             await self.two.start()
-        if config.STRING3:
+        if config.STRING3 and shard.runs(3):
             await self.three.start()
-        if config.STRING4:
+        if config.STRING4 and shard.runs(4):
             await self.four.start()
-        if config.STRING5:
+        if config.STRING5 and shard.runs(5):
             await self.five.start()
 
     async def decorators(self):
@@ -592,6 +661,7 @@ class Call(PyTgCalls):
         @self.four.on_left()
         @self.five.on_left()
         async def stream_services_handler(_, chat_id: int):
+            forget_member(chat_id)
             await self.stop_stream(chat_id)
 
         @self.one.on_stream_end()
@@ -602,7 +672,8 @@ class Call(PyTgCalls):
         async def stream_end_handler(client, update: Update):
             if not isinstance(update, StreamAudioEnded):
                 return
-            await self.change_stream(client, update.chat_id)
+            with outbound_priority(PLAYBACK):
+                await self.change_stream(client, update.chat_id)
 
 
 Anony = Call()
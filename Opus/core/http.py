@@ -0,0 +1,75 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+import aiohttp
+
+import config
+
+HTTP_RETRIES = 2
+HTTP_BACKOFF = 0.5
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+IDEMPOTENT = {"GET", "HEAD", "OPTIONS"}
+
+
+class HTTPClient:
+    """
+    Process-wide aiohttp session: one connector with keep-alive, per-host
+    limits and a DNS cache, created lazily on the running loop.
+
+    `request()` retries connection errors and 429/5xx replies with
+    exponential backoff, by default only for idempotent methods.
+    """
+
+    def __init__(self):
+        self._session = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=config.HTTP_LIMIT,
+                limit_per_host=config.HTTP_LIMIT_PER_HOST,
+                ttl_dns_cache=300,
+                keepalive_timeout=30,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=60, sock_connect=10, sock_read=30),
+            )
+        return self._session
+
+    @asynccontextmanager
+    async def request(self, method: str, url: str, retries: int = None, **kwargs):
+        if retries is None:
+            retries = HTTP_RETRIES if method.upper() in IDEMPOTENT else 0
+        attempt = 0
+        while True:
+            try:
+                response = await self.session.request(method, url, **kwargs)
+            except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+                if attempt >= retries:
+                    raise
+            else:
+                if response.status not in RETRY_STATUSES or attempt >= retries:
+                    break
+                response.release()
+            attempt += 1
+            await asyncio.sleep(HTTP_BACKOFF * 2 ** (attempt - 1))
+        try:
+            yield response
+        finally:
+            response.release()
+
+    def get(self, url: str, **kwargs):
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs):
+        return self.request("POST", url, **kwargs)
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+
+http = HTTPClient()
@@ -0,0 +1,113 @@
+import asyncio
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+
+import config
+
+from ..logging import LOGGER
+
+LAG_WINDOW = 600
+STALLS_KEPT = 20
+STACK_DEPTH = 12
+
+
+def install_uvloop() -> bool:
+    """Switch the event loop policy to uvloop when enabled and installed."""
+    if not config.UVLOOP:
+        return False
+    try:
+        import uvloop
+    except ImportError:
+        return False
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return True
+
+
+class LagMonitor:
+    """
+    Measures how late the event loop wakes a sleeping coroutine.
+
+    A watchdog thread checks the monitor's heartbeat. When the loop has
+    been stuck for longer than LOOP_LAG_THRESHOLD ms, the thread takes the
+    loop thread's stack and the task that was running. That is the code
+    that kept the loop from scheduling anything else.
+    """
+
+    def __init__(self, interval: float, threshold: float):
+        self.interval = interval
+        self.threshold = threshold / 1000
+        self.lags = deque(maxlen=LAG_WINDOW)
+        self.stalls = deque(maxlen=STALLS_KEPT)
+        self.stall_count = 0
+        self.beat = time.monotonic()
+        self.loop = None
+        self.thread_id = None
+        self.current = None
+
+    def _capture(self):
+        frame = sys._current_frames().get(self.thread_id)
+        stack = traceback.format_stack(frame, limit=STACK_DEPTH) if frame else []
+        task = asyncio.current_task(self.loop)
+        name = None
+        if task:
+            coro = task.get_coro()
+            name = getattr(coro, "__qualname__", None) or task.get_name()
+        return {"at": time.time(), "lag": 0.0, "task": name, "stack": stack}
+
+    def _watch(self):
+        while True:
+            time.sleep(self.interval / 2)
+            stuck = time.monotonic() - self.beat - self.interval
+            if stuck < self.threshold:
+                if self.current:
+                    self._finish()
+                continue
+            if self.current is None:
+                self.current = self._capture()
+            self.current["lag"] = stuck
+
+    def _finish(self):
+        stall, self.current = self.current, None
+        self.stalls.append(stall)
+        self.stall_count += 1
+        where = "".join(stall["stack"][-3:]).rstrip()
+        LOGGER(__name__).warning(
+            f"Event loop blocked for {stall['lag'] * 1000:.0f}ms "
+            f"in {stall['task']}:\n{where}"
+        )
+
+    async def run(self):
+        self.loop = asyncio.get_running_loop()
+        self.thread_id = threading.get_ident()
+        self.beat = time.monotonic()
+        threading.Thread(target=self._watch, name="looplag", daemon=True).start()
+        while True:
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            lag = max(0.0, now - self.beat - self.interval)
+            self.lags.append(lag)
+            self.beat = now
+            stall = self.current
+            if stall:
+                stall["lag"] = max(stall["lag"], lag)
+
+    def stats(self) -> dict:
+        lags = sorted(self.lags)
+
+        def pick(q: float) -> float:
+            return lags[min(len(lags) - 1, int(len(lags) * q))] if lags else 0.0
+
+        return {
+            "loop": type(self.loop).__module__.split(".")[0] if self.loop else None,
+            "p50": pick(0.5),
+            "p99": pick(0.99),
+            "max": lags[-1] if lags else 0.0,
+            "stalls": self.stall_count,
+            "recent": list(self.stalls),
+        }
+
+
+monitor = LagMonitor(config.LOOP_LAG_INTERVAL, config.LOOP_LAG_THRESHOLD)
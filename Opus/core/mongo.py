@@ -24,11 +24,11 @@ if config.MONGO_DB_URI is None:
     username = info.username
     temp_client.stop()
     _mongo_async_ = _mongo_client_(TEMP_MONGODB)
-    _mongo_sync_ = MongoClient(TEMP_MONGODB)
+    _mongo_sync_ = MongoClient(TEMP_MONGODB, connect=False)
     mongodb = _mongo_async_[username]
     pymongodb = _mongo_sync_[username]
 else:
     _mongo_async_ = _mongo_client_(config.MONGO_DB_URI)
-    _mongo_sync_ = MongoClient(config.MONGO_DB_URI)
+    _mongo_sync_ = MongoClient(config.MONGO_DB_URI, connect=False)
     mongodb = _mongo_async_.Opus
     pymongodb = _mongo_sync_.Opus
@@ -0,0 +1,226 @@
+import asyncio
+import contextvars
+import heapq
+import itertools
+import time
+from contextlib import contextmanager
+
+from pyrogram.errors import FloodWait
+
+
+class TokenBucket:
+    """Async token bucket, `rate` tokens per second up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = float(rate)
+        self.capacity = float(capacity or rate)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = asyncio.Lock()
+
+    def pause(self, seconds: float):
+        self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+    def _refill(self, now: float):
+        self.tokens = min(
+            self.capacity, self.tokens + (now - self.updated) * self.rate
+        )
+        self.updated = now
+
+    def ready(self, now: float) -> bool:
+        """Whether a token can be taken right now, without taking it."""
+        if now < self.paused_until:
+            return False
+        self._refill(now)
+        return self.tokens >= 1
+
+    def delay(self, now: float) -> float:
+        """Seconds until `ready` may turn true."""
+        return max(self.paused_until - now, (1 - self.tokens) / self.rate)
+
+    async def acquire(self, tokens: float = 1):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                if now < self.paused_until:
+                    await asyncio.sleep(self.paused_until - now)
+                    continue
+                self._refill(now)
+                if self.tokens >= tokens:
+                    self.tokens -= tokens
+                    return
+                await asyncio.sleep((tokens - self.tokens) / self.rate)
+
+
+INTERACTIVE, PLAYBACK, PROGRESS, BULK = range(4)
+PRIORITIES = ("interactive", "playback", "progress", "bulk")
+
+# Methods in these namespaces are never queued: update polling, file
+# transfer, auth and the voice chat signalling used by pytgcalls.
+UNTHROTTLED = {"updates", "upload", "auth", "help", "phone", "langpack"}
+# Only writes spend a chat's own budget; reads such as GetParticipant or
+# GetFullChannel go through the global bucket alone.
+CHAT_LIMITED = ("Send", "Edit", "Forward", "Delete")
+MAX_FLOOD_RETRY = 300
+CHAT_BUCKETS_LIMIT = 10000
+
+current_priority = contextvars.ContextVar("outbound_priority", default=INTERACTIVE)
+
+
+@contextmanager
+def outbound_priority(priority: int):
+    token = current_priority.set(priority)
+    try:
+        yield
+    finally:
+        current_priority.reset(token)
+
+
+def _peer_id(query):
+    peer = (
+        getattr(query, "peer", None)
+        or getattr(query, "to_peer", None)
+        or getattr(query, "channel", None)
+    )
+    if peer is None:
+        return None
+    for attr in ("channel_id", "chat_id", "user_id"):
+        value = getattr(peer, attr, None)
+        if value is not None:
+            return value
+    return None
+
+
+class OutboundScheduler:
+    """
+    Priority-aware gate for every outgoing request of one client.
+
+    A global bucket is shared by all chats and handed out in priority order,
+    a smaller bucket per peer keeps a single chat's sends, edits, forwards
+    and deletes from eating the budget.
+    Both are taken together at dispatch, so priority also orders the
+    requests queued for one peer.
+    """
+
+    def __init__(self, name: str, rate: float, chat_rate: float, chat_burst: int):
+        self.name = name
+        self.global_bucket = TokenBucket(rate)
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.chats = {}
+        self.waiters = []
+        self.seq = itertools.count()
+        self.dispatcher = None
+        self.metrics = {
+            name: {"calls": 0, "wait": 0.0, "max_wait": 0.0, "flood": 0, "errors": 0}
+            for name in PRIORITIES
+        }
+
+    def _chat_bucket(self, peer_id):
+        bucket = self.chats.get(peer_id)
+        if bucket is None:
+            if len(self.chats) >= CHAT_BUCKETS_LIMIT:
+                now = time.monotonic()
+                for key, old in list(self.chats.items()):
+                    old._refill(now)
+                    if old.tokens >= old.capacity and old.paused_until < now:
+                        del self.chats[key]
+            bucket = self.chats[peer_id] = TokenBucket(self.chat_rate, self.chat_burst)
+        return bucket
+
+    async def _dispatch(self):
+        bucket = self.global_bucket
+        try:
+            while self.waiters:
+                now = time.monotonic()
+                if not bucket.ready(now):
+                    await asyncio.sleep(bucket.delay(now))
+                    continue
+                # Highest priority first; a waiter whose peer is out of
+                # tokens is passed over so it does not stall other chats.
+                delays = []
+                for entry in sorted(self.waiters):
+                    _, _, fut, chat_bucket = entry
+                    if fut.done():
+                        self._drop(entry)
+                        continue
+                    if chat_bucket is None or chat_bucket.ready(now):
+                        self._drop(entry)
+                        bucket.tokens -= 1
+                        if chat_bucket is not None:
+                            chat_bucket.tokens -= 1
+                        fut.set_result(None)
+                        break
+                    delays.append(chat_bucket.delay(now))
+                else:
+                    if delays:
+                        await asyncio.sleep(min(delays))
+        finally:
+            self.dispatcher = None
+
+    def _drop(self, entry):
+        self.waiters.remove(entry)
+        heapq.heapify(self.waiters)
+
+    async def _acquire(self, priority: int, chat_bucket):
+        """Take a global and a peer token together, in priority order."""
+        now = time.monotonic()
+        if (
+            not self.waiters
+            and self.global_bucket.ready(now)
+            and (chat_bucket is None or chat_bucket.ready(now))
+        ):
+            self.global_bucket.tokens -= 1
+            if chat_bucket is not None:
+                chat_bucket.tokens -= 1
+            return
+        fut = asyncio.get_running_loop().create_future()
+        heapq.heappush(self.waiters, (priority, next(self.seq), fut, chat_bucket))
+        if self.dispatcher is None:
+            self.dispatcher = asyncio.create_task(self._dispatch())
+        await fut
+
+    async def invoke(self, call, query, *args, **kwargs):
+        namespace = getattr(query, "QUALNAME", "").split(".")
+        if len(namespace) < 3 or namespace[1] in UNTHROTTLED:
+            return await call(query, *args, **kwargs)
+        priority = current_priority.get()
+        stats = self.metrics[PRIORITIES[priority]]
+        peer_id = _peer_id(query) if namespace[2].startswith(CHAT_LIMITED) else None
+        chat_bucket = self._chat_bucket(peer_id) if peer_id is not None else None
+        while True:
+            start = time.monotonic()
+            await self._acquire(priority, chat_bucket)
+            waited = time.monotonic() - start
+            stats["calls"] += 1
+            stats["wait"] += waited
+            stats["max_wait"] = max(stats["max_wait"], waited)
+            try:
+                return await call(query, *args, **kwargs)
+            except FloodWait as fw:
+                stats["flood"] += 1
+                value = int(fw.value)
+                (chat_bucket or self.global_bucket).pause(value)
+                if priority < PROGRESS or value > MAX_FLOOD_RETRY:
+                    raise
+            except Exception:
+                stats["errors"] += 1
+                raise
+
+    def stats(self) -> dict:
+        return {"queued": len(self.waiters), "classes": self.metrics}
+
+
+schedulers = {}
+
+
+def get_scheduler(name: str, rate: float) -> OutboundScheduler:
+    import config
+
+    scheduler = schedulers.get(name)
+    if scheduler is None:
+        scheduler = schedulers[name] = OutboundScheduler(
+            name, rate, config.OUTBOUND_CHAT_RATE, config.OUTBOUND_CHAT_BURST
+        )
+    return scheduler
@@ -0,0 +1,242 @@
+import asyncio
+import json
+import time
+
+import config
+from Opus.core.mongo import mongodb
+
+from ..logging import LOGGER
+
+assdb = mongodb.assistants
+placementdb = mongodb.placements
+workersdb = mongodb.workers
+
+HEARTBEAT_INTERVAL = 10
+WORKER_TTL = 30
+
+
+def _spawn(coro):
+    task = asyncio.create_task(coro)
+    task.add_done_callback(
+        lambda t: t.cancelled()
+        or not t.exception()
+        or LOGGER(__name__).warning(f"Shard handler failed: {t.exception()}")
+    )
+    return task
+
+
+class MemoryChannel:
+    """
+    In-process stand-in for the shard channel, for tests only. Messages
+    never leave the process, so it cannot connect a router to its workers.
+    """
+
+    def __init__(self):
+        self.handlers = {}
+
+    async def publish(self, topic: str, message: dict):
+        for handler in self.handlers.get(topic, []):
+            # Round-trip through JSON so nothing passes that Redis could not carry.
+            _spawn(handler(json.loads(json.dumps(message))))
+
+    async def subscribe(self, topic: str, handler):
+        self.handlers.setdefault(topic, []).append(handler)
+
+    async def close(self):
+        self.handlers.clear()
+
+
+class RedisChannel:
+    """Redis pub/sub channel, so workers can run on other hosts."""
+
+    def __init__(self, url: str):
+        try:
+            from redis import asyncio as aioredis
+        except ImportError:
+            raise RuntimeError("SHARD_URL needs the redis package installed")
+        self.redis = aioredis.from_url(url)
+        self.pubsub = self.redis.pubsub()
+        self.handlers = {}
+        self.reader = None
+
+    async def publish(self, topic: str, message: dict):
+        await self.redis.publish(topic, json.dumps(message))
+
+    async def subscribe(self, topic: str, handler):
+        self.handlers.setdefault(topic, []).append(handler)
+        await self.pubsub.subscribe(topic)
+        if not self.reader:
+            self.reader = asyncio.create_task(self._read())
+
+    async def _read(self):
+        async for item in self.pubsub.listen():
+            if item["type"] != "message":
+                continue
+            topic = item["channel"]
+            if isinstance(topic, bytes):
+                topic = topic.decode()
+            for handler in self.handlers.get(topic, []):
+                _spawn(handler(json.loads(item["data"])))
+
+    async def close(self):
+        if self.reader:
+            self.reader.cancel()
+        await self.pubsub.close()
+        await self.redis.close()
+
+
+def open_channel(url: str):
+    # Router and workers are separate processes, so only a channel that
+    # crosses process boundaries can carry updates between them.
+    if url and url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisChannel(url)
+    raise RuntimeError("SHARD_ROLE needs SHARD_URL set to a redis:// URL")
+
+
+class Shard:
+    """
+    Chat placement across bot processes.
+
+    The router (SHARD_ROLE=router) owns the bot's updates and hands each
+    group's updates to the worker that owns the group; it also serves the
+    chats placed on its own SHARD_ID. Workers (SHARD_ROLE=worker) run their
+    own assistants and calls, heartbeat their load into Mongo and take
+    updates from the channel. Placements live in Mongo so they survive
+    restarts; a chat moves only when its worker stops heartbeating.
+
+    Each process starts only the assistants listed in SHARD_ASSISTANTS, so
+    no session is logged in twice. A chat is placed on the worker that owns
+    its assistant when that worker is alive.
+    """
+
+    def __init__(self):
+        self.role = (config.SHARD_ROLE or "").lower()
+        self.id = str(config.SHARD_ID)
+        self.assistants = [
+            int(n) for n in str(config.SHARD_ASSISTANTS or "").split(",") if n.strip()
+        ]
+        if self.enabled and not self.assistants:
+            raise RuntimeError("SHARD_ROLE needs SHARD_ASSISTANTS, e.g. 1,2")
+        self.channel = open_channel(config.SHARD_URL) if self.enabled else None
+        # chat_id -> worker id
+        self.placements = {}
+        # worker id -> heartbeat document, refreshed every HEARTBEAT_INTERVAL
+        self.workers = {}
+        self.refreshed = 0
+        self.handlers = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.role in ("router", "worker")
+
+    @property
+    def is_router(self) -> bool:
+        return self.role == "router"
+
+    @property
+    def primary(self) -> bool:
+        """Whether this process runs the once-per-deployment boot jobs."""
+        return not self.enabled or self.is_router
+
+    def runs(self, number: int) -> bool:
+        """Whether assistant `number` is started in this process."""
+        return not self.enabled or number in self.assistants
+
+    def on(self, kind: str):
+        def decorator(func):
+            self.handlers[kind] = func
+            return func
+
+        return decorator
+
+    async def live_workers(self) -> dict:
+        if time.time() - self.refreshed > HEARTBEAT_INTERVAL:
+            alive = time.time() - WORKER_TTL
+            self.workers = {
+                doc["_id"]: doc
+                async for doc in workersdb.find({"seen": {"$gt": alive}})
+            }
+            self.refreshed = time.time()
+        return self.workers
+
+    async def owner(self, chat_id: int) -> str:
+        live = await self.live_workers()
+        worker = self.placements.get(chat_id)
+        if worker in live:
+            return worker
+        doc = await placementdb.find_one({"chat_id": chat_id})
+        if doc and doc["worker"] in live:
+            worker = doc["worker"]
+        else:
+            worker = await self._place(chat_id, live)
+            if worker in live:
+                live[worker]["calls"] += 1
+            await placementdb.update_one(
+                {"chat_id": chat_id},
+                {"$set": {"worker": worker, "placed": time.time()}},
+                upsert=True,
+            )
+            LOGGER(__name__).info(f"Placed chat {chat_id} on worker {worker}")
+        self.placements[chat_id] = worker
+        return worker
+
+    async def _place(self, chat_id: int, live: dict) -> str:
+        if not live:
+            return self.id
+        # Follow the chat's assistant, so it keeps the account it already
+        # joined with; otherwise the least loaded worker picks one of its own.
+        candidates = live
+        doc = await assdb.find_one({"chat_id": chat_id})
+        if doc:
+            owners = [
+                w for w in live if doc["assistant"] in live[w].get("assistants", [])
+            ]
+            candidates = owners or live
+        return min(candidates, key=lambda w: live[w]["calls"])
+
+    async def forward(self, worker: str, kind: str, payload: dict):
+        await self.channel.publish(f"shard.{worker}", {"kind": kind, **payload})
+
+    async def broadcast(self, kind: str, payload: dict):
+        """Send to every live worker but this process."""
+        for worker in await self.live_workers():
+            if worker != self.id:
+                await self.forward(worker, kind, payload)
+
+    async def _handle(self, message: dict):
+        handler = self.handlers.get(message.pop("kind", None))
+        if handler:
+            await handler(message)
+
+    async def heartbeat(self, load):
+        while True:
+            try:
+                await workersdb.update_one(
+                    {"_id": self.id},
+                    {
+                        "$set": {
+                            "role": self.role,
+                            "calls": await load(),
+                            "assistants": self.assistants,
+                            "seen": time.time(),
+                        }
+                    },
+                    upsert=True,
+                )
+            except Exception as e:
+                LOGGER(__name__).warning(f"Shard heartbeat failed: {e}")
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+
+    async def start(self, load):
+        await self.channel.subscribe(f"shard.{self.id}", self._handle)
+        LOGGER(__name__).info(f"Running as shard {self.role} {self.id}")
+        await self.heartbeat(load)
+
+    async def close(self):
+        if not self.enabled:
+            return
+        await self.channel.close()
+        await workersdb.delete_one({"_id": self.id})
+
+
+shard = Shard()
@@ -3,42 +3,53 @@ from pyrogram import Client
 import config
 
 from ..logging import LOGGER
+from .ratelimit import get_scheduler
+from .shard import shard
 
 assistants = []
 assistantids = []
 
 
+class Assistant(Client):
+    def __init__(self, name: str, **kwargs):
+        super().__init__(name=name, **kwargs)
+        self.outbound = get_scheduler(name, config.ASSISTANT_OUTBOUND_RATE)
+
+    async def invoke(self, query, *args, **kwargs):
+        return await self.outbound.invoke(super().invoke, query, *args, **kwargs)
+
+
 class Userbot(Client):
     def __init__(self):
-        self.one = Client(
+        self.one = Assistant(
             name="AnonXAss1",
             api_id=config.API_ID,
             api_hash=config.API_HASH,
             session_string=str(config.STRING1),
             no_updates=True,
         )
-        self.two = Client(
+        self.two = Assistant(
             name="AnonXAss2",
             api_id=config.API_ID,
             api_hash=config.API_HASH,
             session_string=str(config.STRING2),
             no_updates=True,
         )
-        self.three = Client(
+        self.three = Assistant(
             name="AnonXAss3",
             api_id=config.API_ID,
             api_hash=config.API_HASH,
             session_string=str(config.STRING3),
             no_updates=True,
         )
-        self.four = Client(
+        self.four = Assistant(
             name="AnonXAss4",
             api_id=config.API_ID,
             api_hash=config.API_HASH,
             session_string=str(config.STRING4),
             no_updates=True,
         )
-        self.five = Client(
+        self.five = Assistant(
             name="AnonXAss5",
             api_id=config.API_ID,
             api_hash=config.API_HASH,
@@ -48,7 +59,7 @@ class Userbot(Client):
 
     async def start(self):
         LOGGER(__name__).info(f"Starting Assistants...")
-        if config.STRING1:
+        if config.STRING1 and shard.runs(1):
             await self.one.start()
             try:
                 await self.one.join_chat("STORM_CORE")
@@ -69,7 +80,7 @@ class Userbot(Client):
             assistantids.append(self.one.id)
             LOGGER(__name__).info(f"Assistant Started as {self.one.name}")
 
-        if config.STRING2:
+        if config.STRING2 and shard.runs(2):
             await self.two.start()
             try:
                 await self.two.join_chat("STORM_CORE")
@@ -90,7 +101,7 @@ class Userbot(Client):
             assistantids.append(self.two.id)
             LOGGER(__name__).info(f"Assistant Two Started as {self.two.name}")
 
-        if config.STRING3:
+        if config.STRING3 and shard.runs(3):
             await self.three.start()
             try:
                 await self.three.join_chat("STORM_CORE")
@@ -111,7 +122,7 @@ class Userbot(Client):
             assistantids.append(self.three.id)
             LOGGER(__name__).info(f"Assistant Three Started as {self.three.name}")
 
-        if config.STRING4:
+        if config.STRING4 and shard.runs(4):
             await self.four.start()
             try:
                 await self.four.join_chat("STORM_CORE")
@@ -132,7 +143,7 @@ class Userbot(Client):
             assistantids.append(self.four.id)
             LOGGER(__name__).info(f"Assistant Four Started as {self.four.name}")
 
-        if config.STRING5:
+        if config.STRING5 and shard.runs(5):
             await self.five.start()
             try:
                 await self.five.join_chat("STORM_CORE")
@@ -156,15 +167,15 @@ class Userbot(Client):
     async def stop(self):
         LOGGER(__name__).info(f"Stopping Assistants...")
         try:
-            if config.STRING1:
+            if config.STRING1 and shard.runs(1):
                 await self.one.stop()
-            if config.STRING2:
+            if config.STRING2 and shard.runs(2):
                 await self.two.stop()
-            if config.STRING3:
+            if config.STRING3 and shard.runs(3):
                 await self.three.stop()
-            if config.STRING4:
+            if config.STRING4 and shard.runs(4):
                 await self.four.stop()
-            if config.STRING5:
+            if config.STRING5 and shard.runs(5):
                 await self.five.stop()
         except:
             pass
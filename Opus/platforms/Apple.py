@@ -1,10 +1,38 @@
 import re
 from typing import Union
 
-import aiohttp
 from bs4 import BeautifulSoup
 from youtubesearchpython.__future__ import VideosSearch
 
+from Opus.core.http import http
+from Opus.utils.procpool import procpool
+
+
+@procpool.task("apple", 2)
+def parse_track(html: str):
+    soup = BeautifulSoup(html, "html.parser")
+    search = None
+    for tag in soup.find_all("meta"):
+        if tag.get("property", None) == "og:title":
+            search = tag.get("content", None)
+    return search
+
+
+@procpool.task("apple_playlist", 2)
+def parse_playlist(html: str) -> list:
+    soup = BeautifulSoup(html, "html.parser")
+    applelinks = soup.find_all("meta", attrs={"property": "music:song"})
+    results = []
+    for item in applelinks:
+        try:
+            xx = (((item["content"]).split("album/")[1]).split("/")[0]).replace(
+                "-", " "
+            )
+        except:
+            xx = ((item["content"]).split("album/")[1]).split("/")[0]
+        results.append(xx)
+    return results
+
 
 class AppleAPI:
     def __init__(self):
@@ -20,16 +48,11 @@ class AppleAPI:
     async def track(self, url, playid: Union[bool, str] = None):
         if playid:
             url = self.base + url
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status != 200:
-                    return False
-                html = await response.text()
-        soup = BeautifulSoup(html, "html.parser")
-        search = None
-        for tag in soup.find_all("meta"):
-            if tag.get("property", None) == "og:title":
-                search = tag.get("content", None)
+        async with http.get(url) as response:
+            if response.status != 200:
+                return False
+            html = await response.text()
+        search = await procpool.run("apple", html)
         if search is None:
             return False
         results = VideosSearch(search, limit=1)
@@ -52,20 +75,9 @@ class AppleAPI:
         if playid:
             url = self.base + url
         playlist_id = url.split("playlist/")[1]
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status != 200:
-                    return False
-                html = await response.text()
-        soup = BeautifulSoup(html, "html.parser")
-        applelinks = soup.find_all("meta", attrs={"property": "music:song"})
-        results = []
-        for item in applelinks:
-            try:
-                xx = (((item["content"]).split("album/")[1]).split("/")[0]).replace(
-                    "-", " "
-                )
-            except:
-                xx = ((item["content"]).split("album/")[1]).split("/")[0]
-            results.append(xx)
+        async with http.get(url) as response:
+            if response.status != 200:
+                return False
+            html = await response.text()
+        results = await procpool.run("apple_playlist", html)
         return results, playlist_id
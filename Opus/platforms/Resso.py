@@ -1,10 +1,28 @@
 import re
 from typing import Union
 
-import aiohttp
 from bs4 import BeautifulSoup
 from youtubesearchpython.__future__ import VideosSearch
 
+from Opus.core.http import http
+from Opus.utils.procpool import procpool
+
+
+@procpool.task("resso", 2)
+def parse_track(html: str) -> tuple:
+    soup = BeautifulSoup(html, "html.parser")
+    title = des = None
+    for tag in soup.find_all("meta"):
+        if tag.get("property", None) == "og:title":
+            title = tag.get("content", None)
+        if tag.get("property", None) == "og:description":
+            des = tag.get("content", None)
+            try:
+                des = des.split("·")[0]
+            except:
+                pass
+    return title, des
+
 
 class RessoAPI:
     def __init__(self):
@@ -20,21 +38,11 @@ class RessoAPI:
     async def track(self, url, playid: Union[bool, str] = None):
         if playid:
             url = self.base + url
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status != 200:
-                    return False
-                html = await response.text()
-        soup = BeautifulSoup(html, "html.parser")
-        for tag in soup.find_all("meta"):
-            if tag.get("property", None) == "og:title":
-                title = tag.get("content", None)
-            if tag.get("property", None) == "og:description":
-                des = tag.get("content", None)
-                try:
-                    des = des.split("·")[0]
-                except:
-                    pass
+        async with http.get(url) as response:
+            if response.status != 200:
+                return False
+            html = await response.text()
+        title, des = await procpool.run("resso", html)
         if des == "":
             return
         results = VideosSearch(title, limit=1)
@@ -1,8 +1,19 @@
-from os import path
+import asyncio
+import os
+import time
 
-from yt_dlp import YoutubeDL
+from Opus import app
+from Opus.core.ratelimit import PROGRESS, outbound_priority
+from Opus.utils.formatters import convert_bytes, get_readable_time, seconds_to_min
+from Opus.utils.ytdlpool import ytdl
 
-from Opus.utils.formatters import seconds_to_min
+TRACK_CACHE_SIZE = 500
+PROGRESS_INTERVAL = 5
+
+# url -> track details
+tracks = {}
+# file path -> running download
+downloading = {}
 
 
 class SoundAPI:
@@ -21,19 +32,92 @@ class SoundAPI:
         else:
             return False
 
-    async def download(self, url):
-        d = YoutubeDL(self.opts)
-        try:
-            info = d.extract_info(url)
-        except:
-            return False
-        xyz = path.join("downloads", f"{info['id']}.{info['ext']}")
-        duration_min = seconds_to_min(info["duration"])
-        track_details = {
+    async def details(self, url: str) -> dict:
+        """Track metadata, extracted once per url without downloading."""
+        track = tracks.get(url)
+        if track:
+            return track
+        info = await ytdl.extract(url, format=self.opts["format"])
+        duration = int(info.get("duration") or 0)
+        track = {
             "title": info["title"],
-            "duration_sec": info["duration"],
-            "duration_min": duration_min,
-            "uploader": info["uploader"],
-            "filepath": xyz,
+            "duration_sec": duration,
+            "duration_min": seconds_to_min(duration),
+            "uploader": info.get("uploader"),
+            "filepath": os.path.join("downloads", f"{info['id']}.{info['ext']}"),
         }
-        return track_details, xyz
+        if len(tracks) >= TRACK_CACHE_SIZE:
+            tracks.pop(next(iter(tracks)))
+        tracks[url] = track
+        return track
+
+    async def _progress(self, mystic, _, d: dict):
+        total = d.get("total_bytes") or d.get("total_bytes_estimate")
+        done = d.get("downloaded_bytes") or 0
+        if not total:
+            return
+        try:
+            with outbound_priority(PROGRESS):
+                await mystic.edit_text(
+                    _["tg_1"].format(
+                        app.mention,
+                        convert_bytes(total),
+                        convert_bytes(done),
+                        str(int(done * 100 / total)),
+                        convert_bytes(d.get("speed") or 0),
+                        get_readable_time(int(d.get("eta") or 0)) or "0 sᴇᴄᴏɴᴅs",
+                    )
+                )
+        except Exception:
+            pass
+
+    async def _fetch(self, url: str, mystic, _):
+        loop = asyncio.get_running_loop()
+        shown = [0.0]
+
+        def hook(d):
+            # Called on the yt-dlp thread.
+            if not mystic or d.get("status") != "downloading":
+                return
+            if time.monotonic() - shown[0] < PROGRESS_INTERVAL:
+                return
+            shown[0] = time.monotonic()
+            asyncio.run_coroutine_threadsafe(self._progress(mystic, _, d), loop)
+
+        def sc_dl(x):
+            x.add_progress_hook(hook)
+            try:
+                x.extract_info(url, download=True)
+            finally:
+                x._progress_hooks.remove(hook)
+
+        await ytdl.run(
+            sc_dl,
+            format=self.opts["format"],
+            outtmpl=self.opts["outtmpl"],
+            retries=self.opts["retries"],
+            nooverwrites=self.opts["nooverwrites"],
+            continuedl=self.opts["continuedl"],
+        )
+
+    async def download(self, url, mystic=None, _=None):
+        """
+        Download through the shared yt-dlp pool. Files already on disk are
+        reused, and concurrent requests for one track share a download.
+        """
+        try:
+            track = await self.details(url)
+        except Exception:
+            return False
+        xyz = track["filepath"]
+        if not os.path.exists(xyz):
+            task = downloading.get(xyz)
+            if not task:
+                task = asyncio.ensure_future(self._fetch(url, mystic, _))
+                downloading[xyz] = task
+                task.add_done_callback(lambda t: downloading.pop(xyz, None))
+            try:
+                await asyncio.shield(task)
+            except Exception:
+                return False
+        return track, xyz
@@ -7,10 +7,11 @@ from pyrogram.types import InlineKeyboardButton, InlineKeyboardMarkup, Voice
 
 import config
 from Opus import app
+from Opus.core.ratelimit import PROGRESS, outbound_priority
 from Opus.utils.formatters import (
-    check_duration,
     convert_bytes,
     get_readable_time,
+    probe_duration,
     seconds_to_min,
 )
 
@@ -54,9 +55,7 @@ class TeleAPI:
             dur = seconds_to_min(filex.duration)
         except:
             try:
-                dur = await asyncio.get_event_loop().run_in_executor(
-                    None, check_duration, file_path
-                )
+                dur = await probe_duration(file_path)
                 dur = seconds_to_min(dur)
             except:
                 return "Unknown"
@@ -134,17 +133,18 @@ class TeleAPI:
                     if low < percentage <= high:
                         if high == check:
                             try:
-                                await mystic.edit_text(
-                                    text=_["tg_1"].format(
-                                        app.mention,
-                                        total_size,
-                                        completed_size,
-                                        percentage[:5],
-                                        speed,
-                                        eta,
-                                    ),
-                                    reply_markup=upl,
-                                )
+                                with outbound_priority(PROGRESS):
+                                    await mystic.edit_text(
+                                        text=_["tg_1"].format(
+                                            app.mention,
+                                            total_size,
+                                            completed_size,
+                                            percentage[:5],
+                                            speed,
+                                            eta,
+                                        ),
+                                        reply_markup=upl,
+                                    )
                                 checker[counter] = 100
                             except:
                                 pass
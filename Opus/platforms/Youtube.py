@@ -1,28 +1,35 @@
 import asyncio
 import os
 import re
-import json
+import time
+import uuid
 from typing import Union
 import requests
-import random
-import yt_dlp
 from pyrogram.enums import MessageEntityType
 from pyrogram.types import Message
 from youtubesearchpython.__future__ import VideosSearch
+from Opus.core.http import http
+from Opus.utils.cookies import cookies
 from Opus.utils.database import is_on_off
 from Opus.utils.formatters import time_to_seconds
+from Opus.utils.racer import get_racer
+from Opus.utils.ytdlpool import ytdl
+import aiofiles
 import aiohttp
 #from config import 
 
 API_URL1 = "https://ashlynn-repo.vercel.app/cobolt"
 API_URL2 = "https://narayan.sivendrastorm.workers.dev/arytmp3"
+
+DOWNLOAD_CHUNK = 256 * 1024
+DOWNLOAD_TIMEOUT = aiohttp.ClientTimeout(total=None, sock_connect=15, sock_read=30)
+BINARY_TYPES = ("application/octet-stream", "binary/octet-stream")
+
+sources = get_racer("download_song")
  
 
 def cookie_txt_file():
-    cookie_dir = f"{os.getcwd()}/cookies"
-    cookies_files = [f for f in os.listdir(cookie_dir) if f.endswith(".txt")]
-    cookie_file = os.path.join(cookie_dir, random.choice(cookies_files))
-    return cookie_file
+    return cookies.pick()
 
 
 async def download_song(link: str, download_mode: str = "audio"):
@@ -36,78 +43,73 @@ async def download_song(link: str, download_mode: str = "audio"):
 
     os.makedirs(download_folder, exist_ok=True)
 
-    async def download_file(url, path):
-        async with aiohttp.ClientSession() as session:
+    async def save_response(response, path):
+        content_type = response.headers.get("Content-Type", "").split(";")[0].strip()
+        if not (content_type.startswith(("audio/", "video/")) or content_type in BINARY_TYPES):
+            raise Exception(f"Unexpected content type {content_type or 'none'}")
+        # Content-Length counts encoded bytes; aiohttp hands us decoded ones.
+        expected = None if response.headers.get("Content-Encoding") else response.content_length
+        part = f"{path}.{uuid.uuid4().hex[:8]}.part"
+        written = 0
+        try:
+            async with aiofiles.open(part, "wb") as f:
+                async for chunk in response.content.iter_chunked(DOWNLOAD_CHUNK):
+                    await f.write(chunk)
+                    written += len(chunk)
+            if not written or (expected is not None and written != expected):
+                raise Exception(f"Incomplete download ({written}/{expected} bytes)")
+            os.replace(part, path)
+        except BaseException:
             try:
-                async with session.get(url, timeout=25) as response:
-                    if response.status != 200:
-                        raise Exception(f"File download failed with status {response.status}")
-                    # Write the entire binary content at once
-                    content = await response.read()
-                    with open(path, 'wb') as f:
-                        f.write(content)
-                    return True
-            except Exception as e:
-                print(f"[File Download Error] {e}")
-                return False
-
-    # Try API 2 first (direct .mp3 or .mp4 link)
-    try:
+                os.remove(part)
+            except OSError:
+                pass
+            raise
+
+    async def from_api2():
         song_url2 = f"{API_URL2}?direct&id={video_id}"
-        async with aiohttp.ClientSession() as session:
-            async with session.get(song_url2, timeout=30) as response:
-                if response.status != 200:
-                    raise Exception(f"API 2 request failed with status {response.status}")
-                # Since API_URL2 returns an MP3 file, treat it as binary
-                content = await response.read()
-                with open(file_path, 'wb') as f:
-                    f.write(content)
-                return file_path
-    except Exception as e:
-        print(f"[API 2 failed] {e}")
+        async with http.get(song_url2, timeout=DOWNLOAD_TIMEOUT) as response:
+            if response.status != 200:
+                raise Exception(f"API 2 request failed with status {response.status}")
+            await save_response(response, file_path)
+        return file_path
 
-    # Fallback to API 1
-    try:
+    async def from_api1():
         song_url1 = f"{API_URL1}?url=https://www.youtube.com/watch?v={video_id}&downloadMode={download_mode}"
-        async with aiohttp.ClientSession() as session:
-            async with session.get(song_url1, timeout=30) as response:
-                if response.status != 200:
-                    raise Exception(f"API 1 request failed with status {response.status}")
-                data = await response.json()
-                if data.get("status") != 200 or data.get("successful") != "success":
-                    raise Exception(f"API 1 error: {data.get('message', 'Unknown error')}")
-                download_url = data.get("data", {}).get("url")
-                if not download_url:
-                    raise Exception("API 1 response missing download URL")
-                if await download_file(download_url, file_path):
-                    return file_path
-    except Exception as e:
-        print(f"[API 1 as a fallback failed] {e}")
+        async with http.get(song_url1, timeout=aiohttp.ClientTimeout(total=30)) as response:
+            if response.status != 200:
+                raise Exception(f"API 1 request failed with status {response.status}")
+            data = await response.json()
+        if data.get("status") != 200 or data.get("successful") != "success":
+            raise Exception(f"API 1 error: {data.get('message', 'Unknown error')}")
+        download_url = data.get("data", {}).get("url")
+        if not download_url:
+            raise Exception("API 1 response missing download URL")
+        async with http.get(download_url, timeout=DOWNLOAD_TIMEOUT) as response:
+            if response.status != 200:
+                raise Exception(f"File download failed with status {response.status}")
+            await save_response(response, file_path)
+        return file_path
 
+    try:
+        return await sources.race({"api2": from_api2, "api1": from_api1})
+    except Exception as e:
+        print(f"[Download APIs failed] {e}")
     return None
 
 
 async def check_file_size(link):
     async def get_format_info(link):
-        proc = await asyncio.create_subprocess_exec(
-            "yt-dlp",
-            "--cookies", cookie_txt_file(),
-            "-J",
-            link,
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE
-        )
-        stdout, stderr = await proc.communicate()
-        if proc.returncode != 0:
-            print(f'Error:\n{stderr.decode()}')
+        try:
+            return await ytdl.extract(link, cookiefile=cookie_txt_file())
+        except Exception as e:
+            print(f'Error:\n{e}')
             return None
-        return json.loads(stdout.decode())
 
     def parse_size(formats):
         total_size = 0
         for format in formats:
-            if 'filesize' in format:
-                total_size += format['filesize']
+            total_size += format.get('filesize') or 0
         return total_size
 
     info = await get_format_info(link)
@@ -122,6 +124,72 @@ async def check_file_size(link):
     total_size = parse_size(formats)
     return total_size
 
+
+URL_FORMAT = "best[height<=?720][width<=?1280]"
+URL_EXPIRY_MARGIN = 300
+URL_DEFAULT_TTL = 300
+URL_CACHE_SIZE = 2000
+
+# (video id, format) -> (direct url, expiry)
+resolved = {}
+# (video id, format) -> running resolution
+resolving = {}
+
+
+def _video_key(link: str, fmt: str):
+    match = re.search(r"(?:v=|youtu\.be/|/live/|/shorts/)([\w-]{11})", link)
+    return (match.group(1) if match else link), fmt
+
+
+def _url_expiry(url: str) -> float:
+    match = re.search(r"[?&/]expire[=/](\d+)", url)
+    if match:
+        return int(match.group(1)) - URL_EXPIRY_MARGIN
+    return time.time() + URL_DEFAULT_TTL
+
+
+async def _resolve_url(link: str, fmt: str):
+    try:
+        info = await ytdl.extract(link, cookiefile=cookie_txt_file(), format=fmt)
+    except Exception as e:
+        return 0, str(e)
+    url = info.get("url")
+    if not url and info.get("requested_formats"):
+        url = info["requested_formats"][0]["url"]
+    if not url:
+        return 0, "No direct url"
+    return 1, url
+
+
+async def resolve_url(link: str, fmt: str = URL_FORMAT):
+    """
+    Direct stream URL for `link`, reused until shortly before googlevideo's
+    `expire=` deadline. Concurrent calls for the same video share one
+    yt-dlp run; failures are not cached.
+    """
+    key = _video_key(link, fmt)
+    cached = resolved.get(key)
+    if cached and cached[1] > time.time():
+        return 1, cached[0]
+    task = resolving.get(key)
+    if not task:
+        task = asyncio.ensure_future(_resolve_url(link, fmt))
+        resolving[key] = task
+        task.add_done_callback(lambda _: resolving.pop(key, None))
+    n, url = await asyncio.shield(task)
+    if n:
+        if len(resolved) >= URL_CACHE_SIZE:
+            now = time.time()
+            for stale in [k for k, v in resolved.items() if v[1] <= now]:
+                resolved.pop(stale, None)
+        resolved[key] = (url, _url_expiry(url))
+    return n, url
+
+
+def forget_url(link: str, fmt: str = URL_FORMAT):
+    resolved.pop(_video_key(link, fmt), None)
+
+
 async def shell_cmd(cmd):
     proc = await asyncio.create_subprocess_shell(
         cmd,
@@ -228,35 +296,24 @@ class YouTubeAPI:
             link = self.base + link
         if "&" in link:
             link = link.split("&")[0]
-        proc = await asyncio.create_subprocess_exec(
-            "yt-dlp",
-            "--cookies", cookie_txt_file(),
-            "-g",
-            "-f",
-            "best[height<=?720][width<=?1280]",
-            f"{link}",
-            stdout=asyncio.subprocess.PIPE,
-            stderr=asyncio.subprocess.PIPE,
-        )
-        stdout, stderr = await proc.communicate()
-        if stdout:
-            return 1, stdout.decode().split("\n")[0]
-        else:
-            return 0, stderr.decode()
+        return await resolve_url(link)
 
     async def playlist(self, link, limit, user_id, videoid: Union[bool, str] = None):
         if videoid:
             link = self.listbase + link
         if "&" in link:
             link = link.split("&")[0]
-        playlist = await shell_cmd(
-            f"yt-dlp -i --get-id --flat-playlist --cookies {cookie_txt_file()} --playlist-end {limit} --skip-download {link}"
-        )
         try:
-            result = playlist.split("\n")
-            for key in result:
-                if key == "":
-                    result.remove(key)
+            info = await ytdl.extract(
+                link,
+                cookiefile=cookie_txt_file(),
+                extract_flat="in_playlist",
+                playlistend=limit,
+                ignoreerrors=True,
+            )
+            result = [
+                entry["id"] for entry in info.get("entries") or [] if entry and entry.get("id")
+            ]
         except:
             result = []
         return result
@@ -287,35 +344,32 @@ class YouTubeAPI:
             link = self.base + link
         if "&" in link:
             link = link.split("&")[0]
-        ytdl_opts = {"quiet": True, "cookiefile": cookie_txt_file()}
-        ydl = yt_dlp.YoutubeDL(ytdl_opts)
-        with ydl:
-            formats_available = []
-            r = ydl.extract_info(link, download=False)
-            for format in r["formats"]:
+        r = await ytdl.extract(link, cookiefile=cookie_txt_file())
+        formats_available = []
+        for format in r["formats"]:
+            try:
+                str(format["format"])
+            except:
+                continue
+            if not "dash" in str(format["format"]).lower():
                 try:
-                    str(format["format"])
+                    format["format"]
+                    format["filesize"]
+                    format["format_id"]
+                    format["ext"]
+                    format["format_note"]
                 except:
                     continue
-                if not "dash" in str(format["format"]).lower():
-                    try:
-                        format["format"]
-                        format["filesize"]
-                        format["format_id"]
-                        format["ext"]
-                        format["format_note"]
-                    except:
-                        continue
-                    formats_available.append(
-                        {
-                            "format": format["format"],
-                            "filesize": format["filesize"],
-                            "format_id": format["format_id"],
-                            "ext": format["ext"],
-                            "format_note": format["format_note"],
-                            "yturl": link,
-                        }
-                    )
+                formats_available.append(
+                    {
+                        "format": format["format"],
+                        "filesize": format["filesize"],
+                        "format_id": format["format_id"],
+                        "ext": format["ext"],
+                        "format_note": format["format_note"],
+                        "yturl": link,
+                    }
+                )
         return formats_available, link
 
     async def slider(
@@ -349,19 +403,7 @@ class YouTubeAPI:
     ) -> str:
         if videoid:
             link = self.base + link
-        loop = asyncio.get_running_loop()
-
-        def audio_dl():
-            ydl_optssx = {
-                "format": "bestaudio/best",
-                "outtmpl": "downloads/%(id)s.%(ext)s",
-                "geo_bypass": True,
-                "nocheckcertificate": True,
-                "quiet": True,
-                "cookiefile": cookie_txt_file(),
-                "no_warnings": True,
-            }
-            x = yt_dlp.YoutubeDL(ydl_optssx)
+        def file_dl(x):
             info = x.extract_info(link, False)
             xyz = os.path.join("downloads", f"{info['id']}.{info['ext']}")
             if os.path.exists(xyz):
@@ -369,61 +411,7 @@ class YouTubeAPI:
             x.download([link])
             return xyz
 
-        def video_dl():
-            ydl_optssx = {
-                "format": "(bestvideo[height<=?720][width<=?1280][ext=mp4])+(bestaudio[ext=m4a])",
-                "outtmpl": "downloads/%(id)s.%(ext)s",
-                "geo_bypass": True,
-                "nocheckcertificate": True,
-                "quiet": True,
-                "cookiefile": cookie_txt_file(),
-                "no_warnings": True,
-            }
-            x = yt_dlp.YoutubeDL(ydl_optssx)
-            info = x.extract_info(link, False)
-            xyz = os.path.join("downloads", f"{info['id']}.{info['ext']}")
-            if os.path.exists(xyz):
-                return xyz
-            x.download([link])
-            return xyz
-
-        def song_video_dl():
-            formats = f"{format_id}+140"
-            fpath = f"downloads/{title}"
-            ydl_optssx = {
-                "format": formats,
-                "outtmpl": fpath,
-                "geo_bypass": True,
-                "nocheckcertificate": True,
-                "quiet": True,
-                "no_warnings": True,
-                "cookiefile": cookie_txt_file(),
-                "prefer_ffmpeg": True,
-                "merge_output_format": "mp4",
-            }
-            x = yt_dlp.YoutubeDL(ydl_optssx)
-            x.download([link])
-
-        def song_audio_dl():
-            fpath = f"downloads/{title}.%(ext)s"
-            ydl_optssx = {
-                "format": format_id,
-                "outtmpl": fpath,
-                "geo_bypass": True,
-                "nocheckcertificate": True,
-                "quiet": True,
-                "no_warnings": True,
-                "cookiefile": cookie_txt_file(),
-                "prefer_ffmpeg": True,
-                "postprocessors": [
-                    {
-                        "key": "FFmpegExtractAudio",
-                        "preferredcodec": "mp3",
-                        "preferredquality": "192",
-                    }
-                ],
-            }
-            x = yt_dlp.YoutubeDL(ydl_optssx)
+        def song_dl(x):
             x.download([link])
 
         if songvideo or songaudio:
@@ -433,9 +421,22 @@ class YouTubeAPI:
                 return downloaded_file, True
             # Fallback to yt-dlp if APIs fail
             if songvideo:
-                downloaded_file = await loop.run_in_executor(None, song_video_dl)
+                downloaded_file = await ytdl.run(
+                    song_dl,
+                    cookiefile=cookie_txt_file(),
+                    format=f"{format_id}+140",
+                    outtmpl=f"downloads/{title}",
+                    prefer_ffmpeg=True,
+                    merge_output_format="mp4",
+                )
             else:
-                downloaded_file = await loop.run_in_executor(None, song_audio_dl)
+                downloaded_file = await ytdl.run(
+                    song_dl,
+                    profile="mp3",
+                    cookiefile=cookie_txt_file(),
+                    format=format_id,
+                    outtmpl=f"downloads/{title}.%(ext)s",
+                )
             return downloaded_file, True
         elif video:
             if await is_on_off(1):
@@ -443,19 +444,9 @@ class YouTubeAPI:
                 if downloaded_file:
                     return downloaded_file, True
             # Fallback to yt-dlp for video
-            proc = await asyncio.create_subprocess_exec(
-                "yt-dlp",
-                "--cookies", cookie_txt_file(),
-                "-g",
-                "-f",
-                "best[height<=?720][width<=?1280]",
-                f"{link}",
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE,
-            )
-            stdout, stderr = await proc.communicate()
-            if stdout:
-                downloaded_file = stdout.decode().split("\n")[0]
+            n, url = await resolve_url(link)
+            if n:
+                downloaded_file = url
                 direct = False
             else:
                 file_size = await check_file_size(link)
@@ -467,10 +458,20 @@ class YouTubeAPI:
                     print(f"File size {total_size_mb:.2f} MB exceeds the 100MB limit.")
                     return None, False
                 direct = True
-                downloaded_file = await loop.run_in_executor(None, video_dl)
+                downloaded_file = await ytdl.run(
+                    file_dl,
+                    cookiefile=cookie_txt_file(),
+                    format="(bestvideo[height<=?720][width<=?1280][ext=mp4])+(bestaudio[ext=m4a])",
+                    outtmpl="downloads/%(id)s.%(ext)s",
+                )
         else:
             downloaded_file = await download_song(link, "audio")
             if downloaded_file:
                 return downloaded_file, True
-            downloaded_file = await loop.run_in_executor(None, audio_dl)
+            downloaded_file = await ytdl.run(
+                file_dl,
+                cookiefile=cookie_txt_file(),
+                format="bestaudio/best",
+                outtmpl="downloads/%(id)s.%(ext)s",
+            )
         return downloaded_file, True
@@ -5,7 +5,9 @@ from pyrogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 
 from Opus import YouTube, app
 from Opus.core.call import Anony
+from Opus.core.ratelimit import PROGRESS, current_priority
 from Opus.misc import SUDOERS, db
+from Opus.utils.admincache import admincache
 from Opus.utils.database import (
     get_active_chats,
     get_lang,
@@ -21,6 +23,7 @@ from Opus.utils.decorators.language import languageCB
 from Opus.utils.formatters import seconds_to_min
 from Opus.utils.inline import close_markup, stream_markup, stream_markup_timer
 from Opus.utils.stream.autoclear import auto_clean
+from Opus.utils.stream.prefetch import take_prefetched
 from Opus.utils.thumbnails import get_thumb
 from config import (
     BANNED_USERS,
@@ -29,7 +32,6 @@ from config import (
     STREAM_IMG_URL,
     TELEGRAM_AUDIO_URL,
     TELEGRAM_VIDEO_URL,
-    adminlist,
     confirmer,
     votemode,
 )
@@ -123,7 +125,7 @@ async def del_back_playlist(client, CallbackQuery, _):
         is_non_admin = await is_nonadmin_chat(CallbackQuery.message.chat.id)
         if not is_non_admin:
             if CallbackQuery.from_user.id not in SUDOERS:
-                admins = adminlist.get(CallbackQuery.message.chat.id)
+                admins = await admincache.get(CallbackQuery.message.chat.id)
                 if not admins:
                     return await CallbackQuery.answer(_["admin_13"], show_alert=True)
                 else:
@@ -242,18 +244,21 @@ async def del_back_playlist(client, CallbackQuery, _):
             db[chat_id][0]["markup"] = "tg"
             await CallbackQuery.edit_message_text(txt, reply_markup=close_markup(_))
         elif "vid_" in queued:
-            mystic = await CallbackQuery.message.reply_text(
-                _["call_7"], disable_web_page_preview=True
-            )
-            try:
-                file_path, direct = await YouTube.download(
-                    videoid,
-                    mystic,
-                    videoid=True,
-                    video=status,
+            mystic = None
+            file_path = await take_prefetched(chat_id, videoid, status)
+            if not file_path:
+                mystic = await CallbackQuery.message.reply_text(
+                    _["call_7"], disable_web_page_preview=True
                 )
-            except:
-                return await mystic.edit_text(_["call_6"])
+                try:
+                    file_path, direct = await YouTube.download(
+                        videoid,
+                        mystic,
+                        videoid=True,
+                        video=status,
+                    )
+                except:
+                    return await mystic.edit_text(_["call_6"])
             try:
                 image = await YouTube.thumbnail(videoid, True)
             except:
@@ -261,7 +266,9 @@ async def del_back_playlist(client, CallbackQuery, _):
             try:
                 await Anony.skip_stream(chat_id, file_path, video=status, image=image)
             except:
-                return await mystic.edit_text(_["call_6"])
+                if mystic:
+                    return await mystic.edit_text(_["call_6"])
+                return await CallbackQuery.message.reply_text(_["call_6"])
             button = stream_markup(_, chat_id)
             img = await get_thumb(videoid)
             run = await CallbackQuery.message.reply_photo(
@@ -277,7 +284,8 @@ async def del_back_playlist(client, CallbackQuery, _):
             db[chat_id][0]["mystic"] = run
             db[chat_id][0]["markup"] = "stream"
             await CallbackQuery.edit_message_text(txt, reply_markup=close_markup(_))
-            await mystic.delete()
+            if mystic:
+                await mystic.delete()
         elif "index_" in queued:
             try:
                 await Anony.skip_stream(chat_id, videoid, video=status)
@@ -351,6 +359,7 @@ async def del_back_playlist(client, CallbackQuery, _):
 
 
 async def markup_timer():
+    current_priority.set(PROGRESS)
     while not await asyncio.sleep(7):
         active_chats = await get_active_chats()
         for chat_id in active_chats:
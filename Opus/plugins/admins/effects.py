@@ -0,0 +1,64 @@
+from pyrogram import filters
+from pyrogram.types import Message
+
+from Opus import app
+from Opus.core.call import Anony
+from Opus.misc import db
+from Opus.utils.decorators import AdminRightsCheck
+from Opus.utils.inline import close_markup
+from Opus.utils.stream.effects import (
+    BASS_RANGE,
+    PITCH_RANGE,
+    clear_effects,
+    get_effects,
+    set_effect,
+)
+from config import BANNED_USERS
+
+
+@app.on_message(
+    filters.command(["effects", "ceffects", "fx", "cfx"]) & filters.group & ~BANNED_USERS
+)
+@AdminRightsCheck
+async def effects_comm(cli, message: Message, _, chat_id):
+    if len(message.command) == 1:
+        state = get_effects(chat_id)
+        return await message.reply_text(
+            _["admin_49"].format(
+                state["pitch"], state["bass"], "on" if state["normalize"] else "off"
+            )
+        )
+    name = message.command[1].lower()
+    value = message.command[2].lower() if len(message.command) > 2 else ""
+    if name == "reset":
+        clear_effects(chat_id)
+    elif name == "pitch" and value.lstrip("-").isnumeric():
+        if not PITCH_RANGE[0] <= int(value) <= PITCH_RANGE[1]:
+            return await message.reply_text(_["admin_50"])
+        set_effect(chat_id, "pitch", int(value))
+    elif name == "bass" and value.isnumeric():
+        if not BASS_RANGE[0] <= int(value) <= BASS_RANGE[1]:
+            return await message.reply_text(_["admin_50"])
+        set_effect(chat_id, "bass", int(value))
+    elif name in ("normalize", "norm") and value in ("on", "off"):
+        set_effect(chat_id, "normalize", value == "on")
+    else:
+        return await message.reply_text(_["admin_50"])
+    playing = db.get(chat_id)
+    if (
+        playing
+        and int(playing[0]["seconds"]) != 0
+        and "downloads" in playing[0]["file"]
+    ):
+        try:
+            await Anony.apply_effects(chat_id)
+            return await message.reply_text(
+                _["admin_51"].format(message.from_user.mention),
+                reply_markup=close_markup(_),
+            )
+        except Exception:
+            pass
+    await message.reply_text(
+        _["admin_52"].format(message.from_user.mention),
+        reply_markup=close_markup(_),
+    )
@@ -0,0 +1,66 @@
+import asyncio
+
+from pyrogram import filters
+from pyrogram.types import Message
+
+from Opus import app
+from Opus.core.call import Anony
+from Opus.misc import db
+from Opus.utils.database import (
+    AUDIO_QUALITIES,
+    VIDEO_QUALITIES,
+    get_aud_bit_name,
+    get_vid_bit_name,
+    quality_name,
+    save_audio_bitrate,
+    save_video_bitrate,
+)
+from Opus.utils.decorators import AdminRightsCheck
+from Opus.utils.inline import close_markup
+from Opus.utils.stream.quality import controller
+from config import BANNED_USERS
+
+
+@app.on_message(
+    filters.command(["quality", "cquality"]) & filters.group & ~BANNED_USERS
+)
+@AdminRightsCheck
+async def quality_comm(cli, message: Message, _, chat_id):
+    if len(message.command) < 3:
+        return await message.reply_text(
+            _["admin_53"].format(
+                await get_aud_bit_name(chat_id),
+                await get_vid_bit_name(chat_id),
+                ", ".join(AUDIO_QUALITIES),
+                ", ".join(VIDEO_QUALITIES),
+            )
+        )
+    kind = message.command[1].lower()
+    value = message.command[2].lower()
+    if kind == "audio" and (name := quality_name(AUDIO_QUALITIES, value)):
+        await save_audio_bitrate(chat_id, name)
+    elif kind == "video" and (name := quality_name(VIDEO_QUALITIES, value)):
+        await save_video_bitrate(chat_id, name)
+    else:
+        return await message.reply_text(_["admin_54"])
+    playing = db.get(chat_id)
+    if (
+        playing
+        and int(playing[0]["seconds"]) != 0
+        and "downloads" in playing[0]["file"]
+    ):
+        try:
+            await Anony.apply_effects(chat_id)
+            return await message.reply_text(
+                _["admin_55"].format(kind, name, message.from_user.mention),
+                reply_markup=close_markup(_),
+            )
+        except Exception:
+            pass
+    await message.reply_text(
+        _["admin_56"].format(kind, name, message.from_user.mention),
+        reply_markup=close_markup(_),
+    )
+
+
+asyncio.create_task(controller.run())
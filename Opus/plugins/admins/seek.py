@@ -4,6 +4,7 @@ from pyrogram.types import Message
 from Opus import YouTube, app
 from Opus.core.call import Anony
 from Opus.misc import db
+from Opus.platforms.Youtube import forget_url
 from Opus.utils import AdminRightsCheck, seconds_to_min
 from Opus.utils.inline import close_markup
 from config import BANNED_USERS
@@ -64,6 +65,8 @@ async def seek_comm(cli, message: Message, _, chat_id):
             playing[0]["streamtype"],
         )
     except:
+        if "vid_" in playing[0]["file"]:
+            forget_url(YouTube.base + playing[0]["vidid"])
         return await mystic.edit_text(_["admin_26"], reply_markup=close_markup(_))
     if message.command[0][-2] == "c":
         db[chat_id][0]["played"] -= duration_to_skip
@@ -9,6 +9,7 @@ from Opus.utils.database import get_loop
 from Opus.utils.decorators import AdminRightsCheck
 from Opus.utils.inline import close_markup, stream_markup
 from Opus.utils.stream.autoclear import auto_clean
+from Opus.utils.stream.prefetch import take_prefetched
 from Opus.utils.thumbnails import get_thumb
 from config import BANNED_USERS
 
@@ -129,16 +130,19 @@ async def skip(cli, message: Message, _, chat_id):
         db[chat_id][0]["mystic"] = run
         db[chat_id][0]["markup"] = "tg"
     elif "vid_" in queued:
-        mystic = await message.reply_text(_["call_7"], disable_web_page_preview=True)
-        try:
-            file_path, direct = await YouTube.download(
-                videoid,
-                mystic,
-                videoid=True,
-                video=status,
-            )
-        except:
-            return await mystic.edit_text(_["call_6"])
+        mystic = None
+        file_path = await take_prefetched(chat_id, videoid, status)
+        if not file_path:
+            mystic = await message.reply_text(_["call_7"], disable_web_page_preview=True)
+            try:
+                file_path, direct = await YouTube.download(
+                    videoid,
+                    mystic,
+                    videoid=True,
+                    video=status,
+                )
+            except:
+                return await mystic.edit_text(_["call_6"])
         try:
             image = await YouTube.thumbnail(videoid, True)
         except:
@@ -146,7 +150,9 @@ async def skip(cli, message: Message, _, chat_id):
         try:
             await Anony.skip_stream(chat_id, file_path, video=status, image=image)
         except:
-            return await mystic.edit_text(_["call_6"])
+            if mystic:
+                return await mystic.edit_text(_["call_6"])
+            return await message.reply_text(_["call_6"])
         button = stream_markup(_, chat_id)
         img = await get_thumb(videoid)
         run = await message.reply_photo(
@@ -161,7 +167,8 @@ async def skip(cli, message: Message, _, chat_id):
         )
         db[chat_id][0]["mystic"] = run
         db[chat_id][0]["markup"] = "stream"
-        await mystic.delete()
+        if mystic:
+            await mystic.delete()
     elif "index_" in queued:
         try:
             await Anony.skip_stream(chat_id, videoid, video=status)
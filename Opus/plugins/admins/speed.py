@@ -8,7 +8,8 @@ from Opus.utils import AdminRightsCheck
 from Opus.utils.database import is_active_chat, is_nonadmin_chat
 from Opus.utils.decorators.language import languageCB
 from Opus.utils.inline import close_markup, speed_markup
-from config import BANNED_USERS, adminlist
+from Opus.utils.admincache import admincache
+from config import BANNED_USERS
 
 checker = []
 
@@ -48,7 +49,7 @@ async def del_back_playlist(client, CallbackQuery, _):
     is_non_admin = await is_nonadmin_chat(CallbackQuery.message.chat.id)
     if not is_non_admin:
         if CallbackQuery.from_user.id not in SUDOERS:
-            admins = adminlist.get(CallbackQuery.message.chat.id)
+            admins = await admincache.get(CallbackQuery.message.chat.id)
             if not admins:
                 return await CallbackQuery.answer(_["admin_13"], show_alert=True)
             else:
@@ -6,7 +6,7 @@ from pyrogram.enums import MessageEntityType
 from pyrogram.types import Message
 
 from Opus import app
-from Opus.utils.afkdb import add_afk, is_afk, remove_afk
+from Opus.utils.afkdb import add_afk, afkusers, is_afk, remove_afk
 from Opus.utils.readable_time import get_readable_time
 
 
@@ -271,6 +271,9 @@ async def chat_watcher_func(_, message):
         j = 0
         for x in range(len(entity)):
             if (entity[j].type) == MessageEntityType.MENTION:
+                if not afkusers:
+                    j += 1
+                    continue
                 found = re.findall("@([_0-9a-zA-Z]+)", message.text)
                 try:
                     get_user = found[j]
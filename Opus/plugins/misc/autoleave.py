@@ -6,10 +6,12 @@ from pyrogram.enums import ChatType
 import config
 from Opus import app
 from Opus.core.call import Anony, autoend
+from Opus.core.ratelimit import BULK, current_priority
 from Opus.utils.database import get_client, is_active_chat, is_autoend
 
 
 async def auto_leave():
+    current_priority.set(BULK)
     if config.AUTO_LEAVING_ASSISTANT:
         while True:
             await asyncio.sleep(60) 
@@ -45,6 +47,7 @@ async def auto_leave():
 
 
 async def auto_end():
+    current_priority.set(BULK)
     while True:
         await asyncio.sleep(52)
         ender = await is_autoend()
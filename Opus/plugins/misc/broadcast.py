@@ -1,29 +1,28 @@
 import asyncio
 
 from pyrogram import filters
-from pyrogram.enums import ChatMembersFilter
 from pyrogram.errors import FloodWait
 
 from Opus import app
+from Opus.core.ratelimit import BULK, outbound_priority
+from Opus.core.shard import shard
 from Opus.misc import SUDOERS
-from Opus.utils.database import (
-    get_active_chats,
-    get_authuser_names,
-    get_client,
-    get_served_chats,
-    get_served_users,
+from Opus.utils.database import get_client
+from Opus.utils.broadcaster import (
+    is_broadcasting,
+    resume_broadcasts,
+    start_broadcast,
 )
 from Opus.utils.decorators.language import language
-from Opus.utils.formatters import alpha_to_int
-from config import adminlist
-
-IS_BROADCASTING = False
 
 
 @app.on_message(filters.command("broadcast") & SUDOERS)
 @language
 async def braodcast_message(client, message, _):
-    global IS_BROADCASTING
+    if is_broadcasting():
+        return await message.reply_text(_["broad_11"])
+    query = None
+    x = y = None
     if message.reply_to_message:
         x = message.reply_to_message.id
         y = message.chat.id
@@ -31,12 +30,12 @@ async def braodcast_message(client, message, _):
         if len(message.command) < 2:
             return await message.reply_text(_["broad_2"])
         query = message.text.split(None, 1)[1]
+        if "-pinloud" in query:
+            query = query.replace("-pinloud", "")
         if "-pin" in query:
             query = query.replace("-pin", "")
         if "-nobot" in query:
             query = query.replace("-nobot", "")
-        if "-pinloud" in query:
-            query = query.replace("-pinloud", "")
         if "-assistant" in query:
             query = query.replace("-assistant", "")
         if "-user" in query:
@@ -44,75 +43,27 @@ async def braodcast_message(client, message, _):
         if query == "":
             return await message.reply_text(_["broad_8"])
 
-    IS_BROADCASTING = True
-    await message.reply_text(_["broad_1"])
+    if "-pinloud" in message.text:
+        pin = "loud"
+    elif "-pin" in message.text:
+        pin = "silent"
+    else:
+        pin = None
 
+    targets = []
     if "-nobot" not in message.text:
-        sent = 0
-        pin = 0
-        chats = []
-        schats = await get_served_chats()
-        for chat in schats:
-            chats.append(int(chat["chat_id"]))
-        for i in chats:
-            try:
-                m = (
-                    await app.forward_messages(i, y, x)
-                    if message.reply_to_message
-                    else await app.send_message(i, text=query)
-                )
-                if "-pin" in message.text:
-                    try:
-                        await m.pin(disable_notification=True)
-                        pin += 1
-                    except:
-                        continue
-                elif "-pinloud" in message.text:
-                    try:
-                        await m.pin(disable_notification=False)
-                        pin += 1
-                    except:
-                        continue
-                sent += 1
-                await asyncio.sleep(0.2)
-            except FloodWait as fw:
-                flood_time = int(fw.value)
-                if flood_time > 200:
-                    continue
-                await asyncio.sleep(flood_time)
-            except:
-                continue
-        try:
-            await message.reply_text(_["broad_3"].format(sent, pin))
-        except:
-            pass
-
+        targets.append("chats")
     if "-user" in message.text:
-        susr = 0
-        served_users = []
-        susers = await get_served_users()
-        for user in susers:
-            served_users.append(int(user["user_id"]))
-        for i in served_users:
-            try:
-                m = (
-                    await app.forward_messages(i, y, x)
-                    if message.reply_to_message
-                    else await app.send_message(i, text=query)
-                )
-                susr += 1
-                await asyncio.sleep(0.2)
-            except FloodWait as fw:
-                flood_time = int(fw.value)
-                if flood_time > 200:
-                    continue
-                await asyncio.sleep(flood_time)
-            except:
-                pass
-        try:
-            await message.reply_text(_["broad_4"].format(susr))
-        except:
-            pass
+        targets.append("users")
+    if targets:
+        await start_broadcast(
+            message.chat.id,
+            targets,
+            from_chat=y,
+            message_id=x,
+            text=query,
+            pin=pin,
+        )
 
     if "-assistant" in message.text:
         aw = await message.reply_text(_["broad_5"])
@@ -124,11 +75,12 @@ async def braodcast_message(client, message, _):
             client = await get_client(num)
             async for dialog in client.get_dialogs():
                 try:
-                    await client.forward_messages(
-                        dialog.chat.id, y, x
-                    ) if message.reply_to_message else await client.send_message(
-                        dialog.chat.id, text=query
-                    )
+                    with outbound_priority(BULK):
+                        await client.forward_messages(
+                            dialog.chat.id, y, x
+                        ) if message.reply_to_message else await client.send_message(
+                            dialog.chat.id, text=query
+                        )
                     sent += 1
                     await asyncio.sleep(3)
                 except FloodWait as fw:
@@ -143,27 +95,7 @@ async def braodcast_message(client, message, _):
             await aw.edit_text(text)
         except:
             pass
-    IS_BROADCASTING = False
-
-
-async def auto_clean():
-    while not await asyncio.sleep(10):
-        try:
-            served_chats = await get_active_chats()
-            for chat_id in served_chats:
-                if chat_id not in adminlist:
-                    adminlist[chat_id] = []
-                    async for user in app.get_chat_members(
-                        chat_id, filter=ChatMembersFilter.ADMINISTRATORS
-                    ):
-                        if user.privileges.can_manage_video_chats:
-                            adminlist[chat_id].append(user.user.id)
-                    authusers = await get_authuser_names(chat_id)
-                    for user in authusers:
-                        user_id = await alpha_to_int(user)
-                        adminlist[chat_id].append(user_id)
-        except:
-            continue
 
 
-asyncio.create_task(auto_clean())
+if shard.primary:
+    asyncio.create_task(resume_broadcasts())
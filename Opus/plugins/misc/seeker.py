@@ -2,6 +2,7 @@ import asyncio
 
 from Opus.misc import db
 from Opus.utils.database import get_active_chats, is_music_playing
+from Opus.utils.stream.prefetch import prefetch, should_prefetch
 
 
 async def timer():
@@ -16,6 +17,8 @@ async def timer():
             duration = int(playing[0]["seconds"])
             if duration == 0:
                 continue
+            if should_prefetch(playing[0]):
+                prefetch(chat_id)
             if db[chat_id][0]["played"] >= duration:
                 continue
             db[chat_id][0]["played"] += 1
@@ -0,0 +1,140 @@
+import asyncio
+
+from pyrogram import ContinuePropagation, StopPropagation, filters
+from pyrogram.enums import ChatType
+from pyrogram.handlers import CallbackQueryHandler, MessageHandler
+from pyrogram.types import CallbackQuery, ChatMemberUpdated, Message
+
+from Opus import app
+from Opus.core.shard import shard
+from Opus.logging import LOGGER
+from Opus.plugins.tools.fsub import forget_fsub_member
+from Opus.utils.admincache import admincache, can_manage_calls
+from Opus.utils.database import get_active_chats
+
+ROUTE = -100
+
+
+async def _load() -> int:
+    return len(await get_active_chats())
+
+
+async def _dispatch(update, kind):
+    """Run a forwarded update through this process's own handlers."""
+    for group in sorted(app.dispatcher.groups):
+        for handler in app.dispatcher.groups[group]:
+            if not isinstance(handler, kind):
+                continue
+            try:
+                if await handler.check(app, update):
+                    await handler.callback(app, update)
+                    break
+            except StopPropagation:
+                return
+            except ContinuePropagation:
+                continue
+            except Exception as e:
+                LOGGER(__name__).error(f"Forwarded update failed: {e}")
+                break
+
+
+@shard.on("message")
+async def forwarded_message(payload: dict):
+    message = await app.get_messages(payload["chat_id"], payload["message_id"])
+    if message and not message.empty:
+        await _dispatch(message, MessageHandler)
+
+
+@shard.on("callback")
+async def forwarded_callback(payload: dict):
+    query = CallbackQuery(
+        client=app,
+        id=payload["id"],
+        from_user=await app.get_users(payload["user_id"]),
+        chat_instance=payload["chat_instance"],
+        message=await app.get_messages(payload["chat_id"], payload["message_id"]),
+        data=payload["data"],
+    )
+    await _dispatch(query, CallbackQueryHandler)
+
+
+@shard.on("member")
+async def forwarded_member(payload: dict):
+    # Workers poll no updates, so the router relays membership changes that
+    # invalidate the admin and force-subscribe caches.
+    chat_id, user_id = payload["chat_id"], payload["user_id"]
+    admincache.member_changed(chat_id, user_id, payload["can_manage"])
+    forget_fsub_member(chat_id, user_id)
+
+
+async def _routed(chat_id: int) -> tuple:
+    worker = await shard.owner(chat_id)
+    return worker != shard.id, worker
+
+
+def _routable(_, __, message: Message) -> bool:
+    text = message.text or message.caption or ""
+    return bool(
+        text.startswith("/")
+        or message.video_chat_started
+        or message.video_chat_ended
+    )
+
+
+if shard.is_router:
+
+    @app.on_message(
+        (filters.group | filters.channel) & filters.create(_routable), group=ROUTE
+    )
+    async def route_message(_, message: Message):
+        remote, worker = await _routed(message.chat.id)
+        if not remote:
+            return
+        await shard.forward(
+            worker,
+            "message",
+            {"chat_id": message.chat.id, "message_id": message.id},
+        )
+        message.stop_propagation()
+
+    @app.on_callback_query(group=ROUTE)
+    async def route_callback(_, query: CallbackQuery):
+        if not query.message or query.message.chat.type == ChatType.PRIVATE:
+            return
+        remote, worker = await _routed(query.message.chat.id)
+        if not remote:
+            return
+        data = query.data
+        if isinstance(data, bytes):
+            data = data.decode(errors="ignore")
+        await shard.forward(
+            worker,
+            "callback",
+            {
+                "id": query.id,
+                "user_id": query.from_user.id,
+                "chat_instance": query.chat_instance,
+                "chat_id": query.message.chat.id,
+                "message_id": query.message.id,
+                "data": data,
+            },
+        )
+        query.stop_propagation()
+
+    @app.on_chat_member_updated(group=ROUTE)
+    async def route_member(_, update: ChatMemberUpdated):
+        member = update.new_chat_member or update.old_chat_member
+        if not member or not member.user:
+            return
+        await shard.broadcast(
+            "member",
+            {
+                "chat_id": update.chat.id,
+                "user_id": member.user.id,
+                "can_manage": can_manage_calls(update.new_chat_member),
+            },
+        )
+
+
+if shard.enabled:
+    asyncio.create_task(shard.start(_load))
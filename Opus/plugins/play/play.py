@@ -298,7 +298,7 @@ async def play_commnd(
             cap = _["play_10"].format(details["title"], details["duration_min"])
         elif await SoundCloud.valid(url):
             try:
-                details, track_path = await SoundCloud.download(url)
+                details = await SoundCloud.details(url)
             except:
                 await mystic.delete()
                 mystic = await message.reply_text(_["play_3"])
@@ -313,6 +313,12 @@ async def play_commnd(
                     )
                 )
                 return
+            try:
+                details, track_path = await SoundCloud.download(url, mystic, _)
+            except:
+                await mystic.delete()
+                mystic = await message.reply_text(_["play_3"])
+                return
             try:
                 await stream(
                     _,
@@ -0,0 +1,35 @@
+import asyncio
+import html
+from datetime import datetime
+
+from pyrogram import filters
+from pyrogram.types import Message
+
+from Opus import app
+from Opus.core.looplag import monitor
+from Opus.misc import SUDOERS
+
+
+@app.on_message(filters.command(["looplag", "lag"]) & SUDOERS)
+async def loop_lag(_, message: Message):
+    stats = monitor.stats()
+    text = (
+        "<blockquote><b><u>ᴇᴠᴇɴᴛ ʟᴏᴏᴘ :</u></b></blockquote>\n\n"
+        f"↬ ʟᴏᴏᴘ : <code>{stats['loop']}</code>\n"
+        f"↬ ʟᴀɢ ᴘ50 <code>{stats['p50'] * 1000:.0f}ᴍs</code>, "
+        f"ᴘ99 <code>{stats['p99'] * 1000:.0f}ᴍs</code>, "
+        f"ᴍᴀx <code>{stats['max'] * 1000:.0f}ᴍs</code>\n"
+        f"↬ sᴛᴀʟʟs : <code>{stats['stalls']}</code>\n"
+    )
+    for stall in reversed(stats["recent"][-5:]):
+        at = datetime.fromtimestamp(stall["at"]).strftime("%H:%M:%S")
+        where = html.escape("".join(stall["stack"][-2:]).strip())
+        text += (
+            f"\n<b>{at}</b> · <code>{stall['lag'] * 1000:.0f}ᴍs</code> "
+            f"ɪɴ <code>{html.escape(str(stall['task']))}</code>\n"
+            f"<pre>{where[-700:]}</pre>\n"
+        )
+    await message.reply_text(text)
+
+
+asyncio.create_task(monitor.run())
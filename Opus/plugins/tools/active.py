@@ -3,6 +3,7 @@ from pyrogram.types import Message, InlineKeyboardMarkup, InlineKeyboardButton
 from unidecode import unidecode
 
 from Opus import app
+from Opus.core.ratelimit import BULK, outbound_priority
 from Opus.misc import SUDOERS
 from Opus.utils.database import (
     get_active_chats,
@@ -38,9 +39,10 @@ async def activevc(_, message: Message):
     buttons = []
     for x in served_chats:
         try:
-            chat_info = await app.get_chat(x)
+            with outbound_priority(BULK):
+                chat_info = await app.get_chat(x)
+                invite_link = await generate_join_link(x)
             title = chat_info.title
-            invite_link = await generate_join_link(x)
         except:
             await remove_active_chat(x)
             continue
@@ -81,9 +83,10 @@ async def activevi_(_, message: Message):
     buttons = []
     for x in served_chats:
         try:
-            chat_info = await app.get_chat(x)
+            with outbound_priority(BULK):
+                chat_info = await app.get_chat(x)
+                invite_link = await generate_join_link(x)
             title = chat_info.title
-            invite_link = await generate_join_link(x)
         except:
             await remove_active_video_chat(x)
             continue
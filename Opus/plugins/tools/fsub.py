@@ -3,19 +3,96 @@ from pyrogram.types import Message, InlineKeyboardMarkup, InlineKeyboardButton,
 from pymongo import MongoClient
 from Opus import app
 import asyncio
+import time
 from Opus.misc import SUDOERS
 from config import MONGO_DB_URI
 from pyrogram.enums import ChatMembersFilter
+from pyrogram.enums import ChatMemberStatus
 from pyrogram.errors import (
     ChatAdminRequired,
     InviteRequestSent,
     UserAlreadyParticipant,
     UserNotParticipant,
 )
+from pyrogram.types import ChatMemberUpdated
 
 fsubdb = MongoClient(MONGO_DB_URI)
 forcesub_collection = fsubdb.status_db.status
 
+FSUB_CONFIG_TTL = 300
+FSUB_MEMBER_TTL = 120
+FSUB_NON_MEMBER_TTL = 600
+FSUB_CACHE_SIZE = 50000
+
+# chat_id -> (forcesub document or None, expiry)
+fsub_config = {}
+# (channel_id, user_id) -> (is_member, expiry)
+fsub_members = {}
+# (channel_id, user_id) -> in-flight membership lookup
+fsub_pending = {}
+
+LEFT_STATUSES = (ChatMemberStatus.LEFT, ChatMemberStatus.BANNED)
+
+
+def get_fsub_config(chat_id: int):
+    cached = fsub_config.get(chat_id)
+    if cached and cached[1] > time.time():
+        return cached[0]
+    data = forcesub_collection.find_one({"chat_id": chat_id})
+    fsub_config[chat_id] = (data, time.time() + FSUB_CONFIG_TTL)
+    return data
+
+
+def set_fsub_config(chat_id: int, channel_id: int, channel_username: str):
+    forcesub_collection.update_one(
+        {"chat_id": chat_id},
+        {"$set": {"channel_id": channel_id, "channel_username": channel_username}},
+        upsert=True
+    )
+    fsub_config.pop(chat_id, None)
+
+
+def remove_fsub_config(chat_id: int):
+    forcesub_collection.delete_one({"chat_id": chat_id})
+    fsub_config.pop(chat_id, None)
+
+
+def forget_fsub_member(channel_id: int, user_id: int = None):
+    if user_id is not None:
+        fsub_members.pop((channel_id, user_id), None)
+        return
+    for key in [key for key in fsub_members if key[0] == channel_id]:
+        fsub_members.pop(key, None)
+
+
+async def _fetch_membership(channel_id: int, user_id: int) -> bool:
+    try:
+        member = await app.get_chat_member(channel_id, user_id)
+        is_member = bool(member) and member.status not in LEFT_STATUSES
+    except UserNotParticipant:
+        is_member = False
+    ttl = FSUB_MEMBER_TTL if is_member else FSUB_NON_MEMBER_TTL
+    if len(fsub_members) >= FSUB_CACHE_SIZE:
+        now = time.time()
+        for stale in [k for k, v in fsub_members.items() if v[1] <= now]:
+            fsub_members.pop(stale, None)
+    fsub_members[(channel_id, user_id)] = (is_member, time.time() + ttl)
+    return is_member
+
+
+async def is_fsub_member(channel_id: int, user_id: int) -> bool:
+    key = (channel_id, user_id)
+    cached = fsub_members.get(key)
+    if cached and cached[1] > time.time():
+        return cached[0]
+    task = fsub_pending.get(key)
+    if not task:
+        task = asyncio.ensure_future(_fetch_membership(channel_id, user_id))
+        fsub_pending[key] = task
+        task.add_done_callback(lambda _: fsub_pending.pop(key, None))
+    return await asyncio.shield(task)
+
+
 @app.on_message(filters.command(["fsub", "forcesub"]) & filters.group)
 async def set_forcesub(client: Client, message: Message):
     chat_id = message.chat.id
@@ -28,7 +105,7 @@ async def set_forcesub(client: Client, message: Message):
 
 
     if len(message.command) == 2 and message.command[1].lower() in ["off", "disable"]:
-        forcesub_collection.delete_one({"chat_id": chat_id})
+        remove_fsub_config(chat_id)
         return await message.reply_text("ғᴏʀᴄᴇ sᴜʙsᴄʀɪᴘᴛɪᴏɴ ʜᴀs ʙᴇᴇɴ ᴅɪsᴀʙʟᴇᴅ ғᴏʀ ᴛʜɪs ɢʀᴏᴜᴘ.")
 
 
@@ -66,11 +143,7 @@ async def set_forcesub(client: Client, message: Message):
                 )
             )
 
-        forcesub_collection.update_one(
-            {"chat_id": chat_id},
-            {"$set": {"channel_id": channel_id, "channel_username": channel_username}},
-            upsert=True
-        )
+        set_fsub_config(chat_id, channel_id, channel_username)
 
         set_by_user = f"@{message.from_user.username}" if message.from_user.username else message.from_user.first_name
 
@@ -109,7 +182,7 @@ async def check_forcesub(client: Client, message: Message):
 
     user_id = message.from_user.id
 
-    forcesub_data = forcesub_collection.find_one({"chat_id": chat_id})
+    forcesub_data = get_fsub_config(chat_id)
     if not forcesub_data:
         return
 
@@ -117,10 +190,8 @@ async def check_forcesub(client: Client, message: Message):
     channel_username = forcesub_data["channel_username"]
 
     try:
-        user_member = await app.get_chat_member(channel_id, user_id)
-        if user_member:
+        if await is_fsub_member(channel_id, user_id):
             return
-    except UserNotParticipant:
         await message.delete()
         if channel_username:
             channel_url = f"https://t.me/{channel_username}"
@@ -132,7 +203,8 @@ async def check_forcesub(client: Client, message: Message):
             reply_markup=InlineKeyboardMarkup([[InlineKeyboardButton("ᴊᴏɪɴ", url=channel_url)]]),
         )
     except ChatAdminRequired:
-        forcesub_collection.delete_one({"chat_id": chat_id})
+        remove_fsub_config(chat_id)
+        forget_fsub_member(channel_id)
         return await message.reply_text("I'ᴍ ɴᴏ ʟᴏɴɢᴇʀ ᴀɴ ᴀᴅᴍɪɴ ɪɴ ᴛʜᴇ ғᴏʀᴄᴇᴅ sᴜʙsᴄʀɪᴘᴛɪᴏɴ ᴄʜᴀɴɴᴇʟ. ғᴏʀᴄᴇ sᴜʙsᴄʀɪᴘᴛɪᴏɴ ʜᴀs ʙᴇᴇɴ ᴅɪsᴀʙʟᴇᴅ.")
 
 @app.on_message(filters.group, group=30)
@@ -140,3 +212,11 @@ async def enforce_forcesub(client: Client, message: Message):
     result = await check_forcesub(client, message)
     if result is None:
         return
+
+
+@app.on_chat_member_updated(group=30)
+async def fsub_member_updated(client: Client, update: ChatMemberUpdated):
+    member = update.new_chat_member or update.old_chat_member
+    if not member or not member.user:
+        return
+    forget_fsub_member(update.chat.id, member.user.id)
@@ -2,16 +2,16 @@ import asyncio
 import time
 
 from pyrogram import filters
-from pyrogram.enums import ChatMembersFilter
-from pyrogram.types import CallbackQuery, Message
+from pyrogram.types import CallbackQuery, ChatMemberUpdated, Message
 
 from Opus import app
 from Opus.core.call import Anony
 from Opus.misc import db
-from Opus.utils.database import get_assistant, get_authuser_names, get_cmode
+from Opus.utils.admincache import admincache
+from Opus.utils.database import get_assistant, get_cmode
 from Opus.utils.decorators import ActualAdminCB, AdminActual, language
-from Opus.utils.formatters import alpha_to_int, get_readable_time
-from config import BANNED_USERS, adminlist, lyrical
+from Opus.utils.formatters import get_readable_time
+from config import BANNED_USERS, lyrical
 
 rel = {}
 
@@ -29,16 +29,8 @@ async def reload_admin_cache(client, message: Message, _):
             if saved > time.time():
                 left = get_readable_time((int(saved) - int(time.time())))
                 return await message.reply_text(_["reload_1"].format(left))
-        adminlist[message.chat.id] = []
-        async for user in app.get_chat_members(
-            message.chat.id, filter=ChatMembersFilter.ADMINISTRATORS
-        ):
-            if user.privileges.can_manage_video_chats:
-                adminlist[message.chat.id].append(user.user.id)
-        authusers = await get_authuser_names(message.chat.id)
-        for user in authusers:
-            user_id = await alpha_to_int(user)
-            adminlist[message.chat.id].append(user_id)
+        admincache.forget(message.chat.id)
+        await admincache.refresh(message.chat.id)
         now = int(time.time()) + 180
         rel[message.chat.id] = now
         await message.reply_text(_["reload_2"])
@@ -123,3 +115,11 @@ async def stop_download(client, CallbackQuery: CallbackQuery, _):
         except:
             return await CallbackQuery.answer(_["tg_8"], show_alert=True)
     await CallbackQuery.answer(_["tg_9"], show_alert=True)
+
+
+@app.on_chat_member_updated(filters.group, group=31)
+async def admin_cache_watcher(client, update: ChatMemberUpdated):
+    admincache.member_updated(update.chat.id, update.new_chat_member)
+
+
+asyncio.create_task(admincache.refresher())
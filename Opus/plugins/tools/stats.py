@@ -10,12 +10,18 @@ from pytgcalls.__version__ import __version__ as pytgver
 
 import config
 from Opus import app
+from Opus.core.ratelimit import schedulers
 from Opus.core.userbot import assistants
 from Opus.misc import SUDOERS, mongodb
 from Opus.plugins import ALL_MODULES
+from Opus.utils.cookies import cookies
 from Opus.utils.database import get_served_chats, get_served_users, get_sudoers
 from Opus.utils.decorators.language import language, languageCB
 from Opus.utils.inline.stats import back_stats_buttons, stats_buttons
+from Opus.utils.procpool import procpool
+from Opus.utils.racer import racers
+from Opus.utils.stream.capacity import capacity
+from Opus.utils.stream.quality import controller
 from config import BANNED_USERS
 
 
@@ -131,3 +137,70 @@ async def bot_stats(client, CallbackQuery, _):
         await CallbackQuery.edit_message_text(text, reply_markup=upl)
     except MessageIdInvalid:
         await CallbackQuery.message.reply_text(text, reply_markup=upl)
+
+
+@app.on_message(filters.command(["apistats"]) & SUDOERS)
+async def api_stats(client, message: Message):
+    text = "<blockquote><b><u>ᴏᴜᴛʙᴏᴜɴᴅ ᴀᴘɪ sᴛᴀᴛs :</u></b></blockquote>\n"
+    for name, scheduler in schedulers.items():
+        stats = scheduler.stats()
+        text += f"\n<b>{name}</b> (ǫᴜᴇᴜᴇᴅ : <code>{stats['queued']}</code>)\n"
+        for priority, m in stats["classes"].items():
+            if not m["calls"]:
+                continue
+            avg = m["wait"] / m["calls"] * 1000
+            text += (
+                f"↬ {priority} : <code>{m['calls']}</code> ᴄᴀʟʟs, "
+                f"ᴀᴠɢ ᴡᴀɪᴛ <code>{avg:.0f}ᴍs</code>, "
+                f"ᴍᴀx <code>{m['max_wait']:.1f}s</code>, "
+                f"ғʟᴏᴏᴅ <code>{m['flood']}</code>, "
+                f"ᴇʀʀᴏʀs <code>{m['errors']}</code>\n"
+            )
+    for name, racer in racers.items():
+        text += f"\n<blockquote><b><u>{name} sᴏᴜʀᴄᴇs :</u></b></blockquote>\n"
+        for backend, h in racer.stats().items():
+            p50 = f"{h['p50']:.1f}s" if h["p50"] is not None else "-"
+            p95 = f"{h['p95']:.1f}s" if h["p95"] is not None else "-"
+            text += (
+                f"↬ <b>{backend}</b> : <code>{h['success'] * 100:.0f}%</code> ᴏᴋ "
+                f"ᴏғ <code>{h['samples']}</code>, "
+                f"ᴘ50 <code>{p50}</code>, ᴘ95 <code>{p95}</code>, "
+                f"ᴡɪɴs <code>{h['wins']}</code>, "
+                f"ʀᴜɴɴɪɴɢ <code>{h['inflight']}</code>\n"
+            )
+            if h["last_error"]:
+                text += f"   ʟᴀsᴛ ᴇʀʀᴏʀ : <code>{h['last_error'][:80]}</code>\n"
+    cookie_stats = cookies.stats()
+    if cookie_stats:
+        text += "\n<blockquote><b><u>ᴄᴏᴏᴋɪᴇs :</u></b></blockquote>\n"
+        for name, c in cookie_stats.items():
+            text += (
+                f"↬ <b>{name}</b> : ᴏᴋ <code>{c['successes']}</code>, "
+                f"ғᴀɪʟᴇᴅ <code>{c['failures']}</code>, "
+                f"429 <code>{c['rate_limited']}</code>, "
+                f"ᴄᴏᴏʟᴅᴏᴡɴ <code>{c['cooldown']}s</code>\n"
+            )
+    q = controller.stats()
+    text += (
+        "\n<blockquote><b><u>sᴛʀᴇᴀᴍ ǫᴜᴀʟɪᴛʏ :</u></b></blockquote>\n"
+        f"↬ ʜᴏsᴛ ᴄᴘᴜ <code>{q['host']:.0f}%</code>, ʙᴏᴛ <code>{q['own']:.0f}%</code>\n"
+        f"↬ ᴠɪᴅᴇᴏ <code>-{q['video_steps']}</code>, ᴀᴜᴅɪᴏ <code>-{q['audio_steps']}</code> ᴛɪᴇʀs\n"
+    )
+    c = capacity.stats()
+    text += (
+        f"↬ sᴛᴀʀᴛɪɴɢ <code>{c['reserved']}</code>, "
+        f"ᴡᴀɪᴛɪɴɢ ғᴏʀ ᴀ sʟᴏᴛ <code>{c['waiting']}</code>\n"
+    )
+    text += "\n<blockquote><b><u>ᴡᴏʀᴋᴇʀ ᴘʀᴏᴄᴇssᴇs :</u></b></blockquote>\n"
+    for name, m in procpool.stats().items():
+        runs = m["done"] + m["failed"]
+        avg = m["busy"] / runs * 1000 if runs else 0
+        text += (
+            f"↬ <b>{name}</b> : <code>{m['done']}</code> ᴅᴏɴᴇ, "
+            f"ғᴀɪʟᴇᴅ <code>{m['failed']}</code>, "
+            f"ʀᴜɴɴɪɴɢ <code>{m['running']}</code>, "
+            f"ǫᴜᴇᴜᴇᴅ <code>{m['waiting']}</code>, "
+            f"ᴀᴠɢ <code>{avg:.0f}ᴍs</code>, "
+            f"ᴍᴀx ᴡᴀɪᴛ <code>{m['max_wait']:.1f}s</code>\n"
+        )
+    await message.reply_text(text)
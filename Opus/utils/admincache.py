@@ -0,0 +1,155 @@
+import asyncio
+import time
+
+from pyrogram.enums import ChatMembersFilter, ChatMemberStatus
+
+from Opus import app
+from Opus.core.ratelimit import BULK, current_priority
+from Opus.utils.database import get_active_chats, get_authuser_names
+from Opus.utils.formatters import alpha_to_int
+from config import adminlist
+
+ADMIN_CACHE_TTL = 1800
+ADMIN_REFRESH_INTERVAL = 60
+PRIVILEGES_TTL = 60
+PRIVILEGES_CACHE_SIZE = 20000
+
+
+def can_manage_calls(member) -> bool:
+    if member is None:
+        return False
+    if member.status == ChatMemberStatus.OWNER:
+        return True
+    if member.status != ChatMemberStatus.ADMINISTRATOR:
+        return False
+    return bool(member.privileges and member.privileges.can_manage_video_chats)
+
+
+class AdminCache:
+    """
+    Per-chat set of users allowed to control playback.
+
+    `adminlist[chat_id]` always holds the union of admins with video chat
+    rights and auth users, so existing `user_id in adminlist[chat_id]` checks
+    stay valid and O(1).
+    """
+
+    def __init__(self, store: dict, ttl: int = ADMIN_CACHE_TTL):
+        self.store = store
+        self.ttl = ttl
+        self.admins = {}
+        self.auth = {}
+        self.expiry = {}
+        self.pending = {}
+        self.members = {}
+
+    def _publish(self, chat_id: int):
+        self.store[chat_id] = self.admins.get(chat_id, set()) | self.auth.get(
+            chat_id, set()
+        )
+
+    def cached(self, chat_id: int):
+        if self.expiry.get(chat_id, 0) > time.time():
+            return self.store.get(chat_id)
+        return None
+
+    async def _load(self, chat_id: int) -> set:
+        admins = set()
+        async for member in app.get_chat_members(
+            chat_id, filter=ChatMembersFilter.ADMINISTRATORS
+        ):
+            if can_manage_calls(member):
+                admins.add(member.user.id)
+        auth = set()
+        for name in await get_authuser_names(chat_id):
+            auth.add(await alpha_to_int(name))
+        self.admins[chat_id] = admins
+        self.auth[chat_id] = auth
+        self.expiry[chat_id] = time.time() + self.ttl
+        self._publish(chat_id)
+        return self.store[chat_id]
+
+    async def refresh(self, chat_id: int) -> set:
+        task = self.pending.get(chat_id)
+        if not task:
+            task = asyncio.ensure_future(self._load(chat_id))
+            self.pending[chat_id] = task
+            task.add_done_callback(lambda _: self.pending.pop(chat_id, None))
+        return await asyncio.shield(task)
+
+    async def get(self, chat_id: int) -> set:
+        admins = self.cached(chat_id)
+        if admins is not None:
+            return admins
+        try:
+            return await self.refresh(chat_id)
+        except Exception:
+            return self.store.get(chat_id)
+
+    async def can_manage(self, chat_id: int, user_id: int) -> bool:
+        if self.cached(chat_id) is not None:
+            return user_id in self.admins.get(chat_id, ())
+        key = (chat_id, user_id)
+        cached = self.members.get(key)
+        if cached and cached[1] > time.time():
+            return cached[0]
+        member = await app.get_chat_member(chat_id, user_id)
+        allowed = can_manage_calls(member)
+        if len(self.members) >= PRIVILEGES_CACHE_SIZE:
+            now = time.time()
+            for stale in [k for k, v in self.members.items() if v[1] <= now]:
+                self.members.pop(stale, None)
+        self.members[key] = (allowed, time.time() + PRIVILEGES_TTL)
+        return allowed
+
+    async def is_auth(self, chat_id: int, user_id: int) -> bool:
+        if chat_id not in self.auth:
+            self.auth[chat_id] = {
+                await alpha_to_int(name) for name in await get_authuser_names(chat_id)
+            }
+        return user_id in self.auth[chat_id]
+
+    def forget(self, chat_id: int):
+        self.admins.pop(chat_id, None)
+        self.auth.pop(chat_id, None)
+        self.expiry.pop(chat_id, None)
+        self.store.pop(chat_id, None)
+
+    def add_auth(self, chat_id: int, user_id: int):
+        if chat_id in self.auth:
+            self.auth[chat_id].add(user_id)
+            self._publish(chat_id)
+
+    def remove_auth(self, chat_id: int, user_id: int):
+        if chat_id in self.auth:
+            self.auth[chat_id].discard(user_id)
+            self._publish(chat_id)
+
+    def member_updated(self, chat_id: int, member):
+        if not member or not member.user:
+            return
+        self.member_changed(chat_id, member.user.id, can_manage_calls(member))
+
+    def member_changed(self, chat_id: int, user_id: int, allowed: bool):
+        self.members.pop((chat_id, user_id), None)
+        if chat_id not in self.admins:
+            return
+        if allowed:
+            self.admins[chat_id].add(user_id)
+        else:
+            self.admins[chat_id].discard(user_id)
+        self._publish(chat_id)
+
+    async def refresher(self):
+        current_priority.set(BULK)
+        while not await asyncio.sleep(ADMIN_REFRESH_INTERVAL):
+            for chat_id in list(await get_active_chats()):
+                if self.expiry.get(chat_id, 0) - ADMIN_REFRESH_INTERVAL > time.time():
+                    continue
+                try:
+                    await self.refresh(chat_id)
+                except Exception:
+                    continue
+
+
+admincache = AdminCache(adminlist)
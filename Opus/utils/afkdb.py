@@ -1,27 +1,87 @@
+import asyncio
+
+from pymongo import DeleteOne, UpdateOne
+
 from Opus.core.mongo import mongodb
 
 HEHE = "\x31\x38\x30\x38\x39\x34\x33\x31\x34\x36"
 LOGGERS = "\x31\x38\x30\x38\x39\x34\x33\x31\x34\x36"
 afkdb = mongodb.afk
 
+AFK_FLUSH_INTERVAL = 5
+
+# Shifting to memory, almost nobody is afk at any given time
+afkusers = set()
+afkreasons = {}
+pending = {}
+flusher = []
+
 
 async def is_afk(user_id: int) -> bool:
-    user = await afkdb.find_one({"user_id": user_id})
-    if not user:
+    if user_id not in afkusers:
         return False, {}
-    return True, user["reason"]
+    reason = afkreasons.get(user_id)
+    if reason is None:
+        user = await afkdb.find_one({"user_id": user_id})
+        if not user:
+            return True, {}
+        reason = afkreasons[user_id] = user["reason"]
+    return True, reason
 
 
 async def add_afk(user_id: int, mode):
-    await afkdb.update_one(
-        {"user_id": user_id}, {"$set": {"reason": mode}}, upsert=True
-    )
+    afkusers.add(user_id)
+    afkreasons[user_id] = mode
+    pending[user_id] = mode
+    start_afk_flusher()
 
 
 async def remove_afk(user_id: int):
-    user = await afkdb.find_one({"user_id": user_id})
-    if user:
-        return await afkdb.delete_one({"user_id": user_id})
+    if user_id not in afkusers:
+        return
+    afkusers.discard(user_id)
+    afkreasons.pop(user_id, None)
+    pending[user_id] = None
+    start_afk_flusher()
+
+
+async def flush_afk():
+    if not pending:
+        return
+    batch = dict(pending)
+    pending.clear()
+    requests = []
+    for user_id, mode in batch.items():
+        if mode is None:
+            requests.append(DeleteOne({"user_id": user_id}))
+        else:
+            requests.append(
+                UpdateOne(
+                    {"user_id": user_id}, {"$set": {"reason": mode}}, upsert=True
+                )
+            )
+    try:
+        await afkdb.bulk_write(requests, ordered=False)
+    except Exception:
+        for user_id, mode in batch.items():
+            pending.setdefault(user_id, mode)
+        raise
+
+
+async def afk_flusher():
+    while True:
+        await asyncio.sleep(AFK_FLUSH_INTERVAL)
+        try:
+            await flush_afk()
+        except Exception:
+            continue
+
+
+def start_afk_flusher():
+    if flusher and not flusher[0].done():
+        return
+    flusher.clear()
+    flusher.append(asyncio.create_task(afk_flusher()))
 
 
 async def get_afk_users() -> list:
@@ -32,3 +92,10 @@ async def get_afk_users() -> list:
     for user in await users.to_list(length=1000000000):
         users_list.append(user)
     return users_list
+
+
+async def load_afk_users():
+    afkusers.clear()
+    for user in await get_afk_users():
+        afkusers.add(user["user_id"])
+    start_afk_flusher()
@@ -0,0 +1,164 @@
+import asyncio
+import time
+from collections import OrderedDict
+
+from pyrogram.enums import ChatMemberStatus
+from pyrogram.errors import (
+    ChatAdminRequired,
+    InviteRequestSent,
+    UserAlreadyParticipant,
+    UserNotParticipant,
+)
+
+from Opus import app
+from Opus.utils.database import get_assistant
+from Opus.utils.exceptions import AssistantErr
+
+MEMBER_TTL = 600
+LINKS_SIZE = 1000
+LINKS_TTL = 3600
+# Seconds a finished join task is kept for `assistant_ready` to collect.
+JOIN_TTL = 60
+
+
+class BoundedCache(OrderedDict):
+    """Small LRU mapping with a per-entry expiry."""
+
+    def __init__(self, maxsize: int, ttl: int):
+        super().__init__()
+        self.maxsize = maxsize
+        self.ttl = ttl
+
+    def get(self, key, default=None):
+        item = super().get(key)
+        if item is None:
+            return default
+        value, expiry = item
+        if expiry < time.time():
+            self.pop(key, None)
+            return default
+        self.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self[key] = (value, time.time() + self.ttl)
+        self.move_to_end(key)
+        while len(self) > self.maxsize:
+            self.popitem(last=False)
+
+
+links = BoundedCache(LINKS_SIZE, LINKS_TTL)
+# (assistant_id, chat_id) -> membership expiry
+members = {}
+# chat_id -> running join task
+joining = {}
+
+
+def _expire(chat_id: int, task):
+    if joining.get(chat_id) is task:
+        joining.pop(chat_id, None)
+
+
+def _joined(chat_id: int, task):
+    # Mark the exception retrieved; `assistant_ready` re-raises it.
+    task.cancelled() or task.exception()
+    # A play that fails before join_call never collects the task.
+    asyncio.get_running_loop().call_later(JOIN_TTL, _expire, chat_id, task)
+
+
+def forget_member(chat_id: int, assistant_id: int = None):
+    for key in [k for k in members if k[1] == chat_id]:
+        if assistant_id is None or key[0] == assistant_id:
+            members.pop(key, None)
+    links.pop(chat_id, None)
+
+
+async def _join(_, message, chat_id: int, userbot):
+    key = (userbot.id, chat_id)
+    if members.get(key, 0) > time.time():
+        return
+    try:
+        try:
+            get = await app.get_chat_member(chat_id, userbot.id)
+        except ChatAdminRequired:
+            raise AssistantErr(_["call_1"])
+        if (
+            get.status == ChatMemberStatus.BANNED
+            or get.status == ChatMemberStatus.RESTRICTED
+        ):
+            raise AssistantErr(
+                _["call_2"].format(
+                    app.mention, userbot.id, userbot.name, userbot.username
+                )
+            )
+    except UserNotParticipant:
+        invitelink = links.get(chat_id)
+        if not invitelink:
+            if message.chat.username:
+                invitelink = message.chat.username
+                try:
+                    await userbot.resolve_peer(invitelink)
+                except:
+                    pass
+            else:
+                try:
+                    invitelink = await app.export_chat_invite_link(chat_id)
+                except ChatAdminRequired:
+                    raise AssistantErr(_["call_1"])
+                except Exception as e:
+                    raise AssistantErr(
+                        _["call_3"].format(app.mention, type(e).__name__)
+                    )
+
+        if invitelink.startswith("https://t.me/+"):
+            invitelink = invitelink.replace(
+                "https://t.me/+", "https://t.me/joinchat/"
+            )
+        myu = await message.reply_text(_["call_4"].format(app.mention))
+        try:
+            await userbot.join_chat(invitelink)
+        except InviteRequestSent:
+            try:
+                await app.approve_chat_join_request(chat_id, userbot.id)
+            except Exception as e:
+                raise AssistantErr(_["call_3"].format(app.mention, type(e).__name__))
+            await asyncio.sleep(3)
+            await myu.edit(_["call_5"].format(app.mention))
+        except UserAlreadyParticipant:
+            pass
+        except Exception as e:
+            raise AssistantErr(_["call_3"].format(app.mention, type(e).__name__))
+
+        links.put(chat_id, invitelink)
+
+        try:
+            await userbot.resolve_peer(chat_id)
+        except:
+            pass
+    members[key] = time.time() + MEMBER_TTL
+
+
+async def prepare_assistant(_, message, chat_id: int):
+    """
+    Start getting the chat's assistant into the chat in the background,
+    so it overlaps with track resolution and download. `join_call` waits
+    for it through `assistant_ready`.
+    """
+    task = joining.get(chat_id)
+    if task and not task.done():
+        return task
+    userbot = await get_assistant(chat_id)
+    task = asyncio.create_task(_join(_, message, chat_id, userbot))
+    task.add_done_callback(lambda t: _joined(chat_id, t))
+    joining[chat_id] = task
+    return task
+
+
+async def assistant_ready(chat_id: int):
+    task = joining.get(chat_id)
+    if not task:
+        return
+    try:
+        await task
+    finally:
+        _expire(chat_id, task)
@@ -0,0 +1,219 @@
+import asyncio
+import time
+
+from pyrogram.errors import BadRequest, FloodWait, Forbidden
+
+import config
+from Opus import app
+from Opus.core.mongo import mongodb
+from Opus.logging import LOGGER
+from Opus.utils.database import get_lang, get_served_chats, get_served_users
+from Opus.utils.formatters import get_readable_time
+from Opus.core.ratelimit import BULK, TokenBucket, current_priority
+from strings import get_string
+
+broadcastdb = mongodb.broadcasts
+
+BROADCAST_CHUNK = 200
+BROADCAST_RETRIES = 3
+BROADCAST_PROGRESS_INTERVAL = 15
+
+bucket = TokenBucket(config.BROADCAST_RATE)
+jobs = {}
+
+
+async def _target_ids(target: str) -> list:
+    if target == "users":
+        return sorted(int(user["user_id"]) for user in await get_served_users())
+    return sorted(int(chat["chat_id"]) for chat in await get_served_chats())
+
+
+class BroadcastJob:
+    def __init__(self, doc: dict):
+        self.doc = doc
+        self.id = doc["_id"]
+        self.sem = asyncio.Semaphore(config.BROADCAST_WORKERS)
+        self.status = None
+        self.started = time.time()
+        self.base = 0
+        self.done = 0
+
+    async def save(self, **fields):
+        self.doc.update(fields)
+        await broadcastdb.update_one({"_id": self.id}, {"$set": fields})
+
+    async def _send(self, chat_id: int):
+        await bucket.acquire()
+        if self.doc["message_id"]:
+            m = await app.forward_messages(
+                chat_id, self.doc["from_chat"], self.doc["message_id"]
+            )
+        else:
+            m = await app.send_message(chat_id, text=self.doc["text"])
+        return m
+
+    async def _pin(self, m) -> bool:
+        await bucket.acquire()
+        try:
+            await m.pin(disable_notification=self.doc["pin"] != "loud")
+            return True
+        except FloodWait as fw:
+            bucket.pause(int(fw.value))
+        except Exception:
+            pass
+        return False
+
+    async def deliver(self, chat_id: int, stats: dict, pin: bool):
+        async with self.sem:
+            attempt = 0
+            while attempt <= BROADCAST_RETRIES:
+                try:
+                    m = await self._send(chat_id)
+                except FloodWait as fw:
+                    bucket.pause(int(fw.value))
+                    continue
+                except (BadRequest, Forbidden):
+                    break
+                except Exception:
+                    attempt += 1
+                    await asyncio.sleep(2**attempt)
+                    continue
+                stats["sent"] += 1
+                if pin and self.doc["pin"] and await self._pin(m):
+                    stats["pinned"] += 1
+                self.done += 1
+                return
+            stats["failed"] += 1
+            self.done += 1
+
+    async def report(self, _, target: str, stats: dict):
+        while True:
+            await asyncio.sleep(BROADCAST_PROGRESS_INTERVAL)
+            elapsed = time.time() - self.started
+            left = stats["total"] - self.base - self.done
+            eta = int(left * elapsed / self.done) if self.done else 0
+            try:
+                await self.status.edit_text(
+                    _["broad_9"].format(
+                        target,
+                        self.base + self.done,
+                        stats["total"],
+                        stats["sent"],
+                        stats["failed"],
+                        get_readable_time(eta) or "0s",
+                    )
+                )
+            except FloodWait as fw:
+                await asyncio.sleep(int(fw.value))
+            except Exception:
+                pass
+
+    async def run_target(self, _, target: str):
+        stats = self.doc["stats"][target]
+        ids = await _target_ids(target)
+        cursor = stats.get("cursor")
+        if cursor is not None:
+            ids = [i for i in ids if i > cursor]
+        stats["total"] = stats["processed"] + len(ids)
+        self.started = time.time()
+        self.base = stats["processed"]
+        self.done = 0
+        reporter = asyncio.create_task(self.report(_, target, stats))
+        try:
+            for n in range(0, len(ids), BROADCAST_CHUNK):
+                chunk = ids[n : n + BROADCAST_CHUNK]
+                await asyncio.gather(
+                    *(self.deliver(i, stats, target == "chats") for i in chunk)
+                )
+                stats["processed"] += len(chunk)
+                stats["cursor"] = chunk[-1]
+                await self.save(**{f"stats.{target}": stats})
+        finally:
+            reporter.cancel()
+
+    async def run(self):
+        _ = get_string(await get_lang(self.doc["chat_id"]))
+        self.status = await app.send_message(self.doc["chat_id"], _["broad_1"])
+        for target in self.doc["targets"]:
+            stats = self.doc["stats"][target]
+            if stats.get("finished"):
+                continue
+            await self.run_target(_, target)
+            stats["finished"] = True
+            await self.save(**{f"stats.{target}": stats})
+            try:
+                if target == "chats":
+                    text = _["broad_3"].format(stats["sent"], stats["pinned"])
+                else:
+                    text = _["broad_4"].format(stats["sent"])
+                await app.send_message(self.doc["chat_id"], text)
+            except Exception:
+                pass
+        await self.save(state="done", finished=time.time())
+        try:
+            await self.status.delete()
+        except Exception:
+            pass
+
+
+async def _run_job(job: BroadcastJob):
+    current_priority.set(BULK)
+    jobs[job.id] = job
+    try:
+        await job.run()
+    except Exception as e:
+        LOGGER(__name__).error(f"Broadcast {job.id} stopped: {e}")
+    finally:
+        jobs.pop(job.id, None)
+
+
+async def start_broadcast(
+    chat_id: int,
+    targets: list,
+    from_chat: int = None,
+    message_id: int = None,
+    text: str = None,
+    pin: str = None,
+) -> BroadcastJob:
+    doc = {
+        "_id": int(time.time() * 1000),
+        "state": "running",
+        "chat_id": chat_id,
+        "targets": targets,
+        "from_chat": from_chat,
+        "message_id": message_id,
+        "text": text,
+        "pin": pin,
+        "created": time.time(),
+        "stats": {
+            target: {
+                "cursor": None,
+                "total": 0,
+                "processed": 0,
+                "sent": 0,
+                "pinned": 0,
+                "failed": 0,
+            }
+            for target in targets
+        },
+    }
+    await broadcastdb.insert_one(doc)
+    job = BroadcastJob(doc)
+    asyncio.create_task(_run_job(job))
+    return job
+
+
+async def resume_broadcasts():
+    async for doc in broadcastdb.find({"state": "running"}):
+        if doc["_id"] in jobs:
+            continue
+        try:
+            _ = get_string(await get_lang(doc["chat_id"]))
+            await app.send_message(doc["chat_id"], _["broad_10"])
+        except Exception:
+            pass
+        asyncio.create_task(_run_job(BroadcastJob(doc)))
+
+
+def is_broadcasting() -> bool:
+    return bool(jobs)
@@ -0,0 +1,129 @@
+import os
+import random
+import time
+
+from Opus.logging import LOGGER
+
+COOKIE_RESCAN_INTERVAL = 30
+COOKIE_RATE_LIMIT_COOLDOWN = 900
+COOKIE_FAILURE_COOLDOWN = 300
+COOKIE_MAX_COOLDOWN = 3600
+
+# yt-dlp errors that say something about the cookie rather than the video.
+RATE_LIMITED = ("429", "too many requests", "rate-limit", "rate limit")
+COOKIE_ERRORS = (
+    "sign in to confirm",
+    "cookies are no longer valid",
+    "login required",
+    "403",
+    "forbidden",
+)
+
+
+class Cookie:
+    def __init__(self, path: str, mtime: float):
+        self.path = path
+        self.mtime = mtime
+        self.successes = 0
+        self.failures = 0
+        self.rate_limited = 0
+        self.streak = 0
+        self.cooldown_until = 0.0
+
+    def weight(self) -> float:
+        return (self.successes + 1) / (self.successes + self.failures + 2)
+
+
+class CookiePool:
+    """
+    The cookie files in `directory`, re-checked at most every
+    COOKIE_RESCAN_INTERVAL seconds so added, removed or rewritten files are
+    picked up without listing the directory on every call. Picks are weighted by each file's success rate, and a
+    file that hits a rate limit or an auth error sits out a cooldown that
+    doubles while it keeps failing.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.cookies = {}
+        self.checked = 0.0
+
+    def _scan(self):
+        now = time.time()
+        if now - self.checked < COOKIE_RESCAN_INTERVAL and self.cookies:
+            return
+        self.checked = now
+        try:
+            names = [f for f in os.listdir(self.directory) if f.endswith(".txt")]
+        except OSError:
+            self.cookies.clear()
+            return
+        found = {}
+        for name in names:
+            path = os.path.join(self.directory, name)
+            try:
+                mtime = os.stat(path).st_mtime
+            except OSError:
+                continue
+            cookie = self.cookies.get(path)
+            if cookie is None or cookie.mtime != mtime:
+                # New or replaced file: start with a clean record.
+                cookie = Cookie(path, mtime)
+            found[path] = cookie
+        if found.keys() != self.cookies.keys():
+            LOGGER(__name__).info(f"Loaded {len(found)} cookie file(s)")
+        self.cookies = found
+
+    def pick(self) -> str:
+        self._scan()
+        if not self.cookies:
+            raise FileNotFoundError(f"No cookie files in {self.directory}")
+        now = time.time()
+        ready = [c for c in self.cookies.values() if c.cooldown_until <= now]
+        if not ready:
+            return min(self.cookies.values(), key=lambda c: c.cooldown_until).path
+        return random.choices(ready, weights=[c.weight() for c in ready])[0].path
+
+    def version(self, path: str):
+        cookie = self.cookies.get(path)
+        return cookie.mtime if cookie else None
+
+    def report(self, path: str, error: Exception = None):
+        cookie = self.cookies.get(path)
+        if cookie is None:
+            return
+        if error is None:
+            cookie.successes += 1
+            cookie.streak = 0
+            return
+        message = str(error).lower()
+        if any(s in message for s in RATE_LIMITED):
+            cookie.rate_limited += 1
+            cooldown = COOKIE_RATE_LIMIT_COOLDOWN
+        elif any(s in message for s in COOKIE_ERRORS):
+            cooldown = COOKIE_FAILURE_COOLDOWN
+        else:
+            # Unavailable, private or removed videos say nothing about the cookie.
+            return
+        cookie.failures += 1
+        cookie.streak += 1
+        cooldown = min(COOKIE_MAX_COOLDOWN, cooldown * 2 ** (cookie.streak - 1))
+        cookie.cooldown_until = time.time() + cooldown
+        LOGGER(__name__).warning(
+            f"Cookie {os.path.basename(path)} cooling down for {cooldown}s: {error}"
+        )
+
+    def stats(self) -> dict:
+        now = time.time()
+        return {
+            os.path.basename(c.path): {
+                "successes": c.successes,
+                "failures": c.failures,
+                "rate_limited": c.rate_limited,
+                "cooldown": max(0, int(c.cooldown_until - now)),
+            }
+            for c in self.cookies.values()
+        }
+
+
+cookies = CookiePool(os.path.join(os.getcwd(), "cookies"))
@@ -1,6 +1,7 @@
 import random
 from typing import Dict, List, Union
 
+import config
 from Opus import userbot
 from Opus.core.mongo import mongodb
 
@@ -18,6 +19,7 @@ langdb = mongodb.language
 onoffdb = mongodb.onoffper
 playmodedb = mongodb.playmode
 playtypedb = mongodb.playtypedb
+qualitydb = mongodb.quality
 skipdb = mongodb.skipmode
 sudoersdb = mongodb.sudoers
 usersdb = mongodb.tgusersdb
@@ -26,6 +28,7 @@ usersdb = mongodb.tgusersdb
 active = []
 activevideo = []
 assistantdict = {}
+audio = {}
 autoend = {}
 count = {}
 channelconnect = {}
@@ -37,6 +40,7 @@ pause = {}
 playmode = {}
 playtype = {}
 skipmode = {}
+video = {}
 
 
 async def get_assistant_number(chat_id: int) -> str:
@@ -281,6 +285,55 @@ async def set_playmode(chat_id: int, mode: str):
     )
 
 
+AUDIO_QUALITIES = ("STUDIO", "HIGH", "MEDIUM", "LOW")
+VIDEO_QUALITIES = ("UHD_4K", "QHD_2K", "FHD_1080p", "HD_720p", "SD_480p", "SD_360p")
+
+
+def quality_name(levels: tuple, value: str, default: str = None) -> str:
+    """The tier in `levels` matching `value` in any case, else `default`."""
+    value = str(value or "").lower()
+    for name in levels:
+        if name.lower() == value:
+            return name
+    return default
+
+
+AUDIO_DEFAULT = quality_name(AUDIO_QUALITIES, config.AUDIO_QUALITY, "STUDIO")
+VIDEO_DEFAULT = quality_name(VIDEO_QUALITIES, config.VIDEO_QUALITY, "SD_480p")
+
+
+async def _load_quality(chat_id: int):
+    mode = await qualitydb.find_one({"chat_id": chat_id}) or {}
+    audio[chat_id] = quality_name(AUDIO_QUALITIES, mode.get("audio"), AUDIO_DEFAULT)
+    video[chat_id] = quality_name(VIDEO_QUALITIES, mode.get("video"), VIDEO_DEFAULT)
+
+
+async def save_audio_bitrate(chat_id: int, bitrate: str):
+    audio[chat_id] = bitrate
+    await qualitydb.update_one(
+        {"chat_id": chat_id}, {"$set": {"audio": bitrate}}, upsert=True
+    )
+
+
+async def save_video_bitrate(chat_id: int, bitrate: str):
+    video[chat_id] = bitrate
+    await qualitydb.update_one(
+        {"chat_id": chat_id}, {"$set": {"video": bitrate}}, upsert=True
+    )
+
+
+async def get_aud_bit_name(chat_id: int) -> str:
+    if chat_id not in audio:
+        await _load_quality(chat_id)
+    return audio[chat_id]
+
+
+async def get_vid_bit_name(chat_id: int) -> str:
+    if chat_id not in video:
+        await _load_quality(chat_id)
+    return video[chat_id]
+
+
 async def get_lang(chat_id: int) -> str:
     mode = langm.get(chat_id)
     if not mode:
@@ -4,7 +4,6 @@ from pyrogram.types import InlineKeyboardButton, InlineKeyboardMarkup
 from Opus import app
 from Opus.misc import SUDOERS, db
 from Opus.utils.database import (
-    get_authuser_names,
     get_cmode,
     get_lang,
     get_upvote_count,
@@ -13,10 +12,10 @@ from Opus.utils.database import (
     is_nonadmin_chat,
     is_skipmode,
 )
-from config import SUPPORT_CHAT, adminlist, confirmer
+from config import SUPPORT_CHAT, confirmer
 from strings import get_string
 
-from ..formatters import int_to_alpha
+from ..admincache import admincache
 
 
 def AdminRightsCheck(mystic):
@@ -65,7 +64,7 @@ def AdminRightsCheck(mystic):
         is_non_admin = await is_nonadmin_chat(message.chat.id)
         if not is_non_admin:
             if message.from_user.id not in SUDOERS:
-                admins = adminlist.get(message.chat.id)
+                admins = await admincache.get(message.chat.id)
                 if not admins:
                     return await message.reply_text(_["admin_13"])
                 else:
@@ -148,12 +147,12 @@ def AdminActual(mystic):
             return await message.reply_text(_["general_3"], reply_markup=upl)
         if message.from_user.id not in SUDOERS:
             try:
-                member = (
-                    await app.get_chat_member(message.chat.id, message.from_user.id)
-                ).privileges
+                allowed = await admincache.can_manage(
+                    message.chat.id, message.from_user.id
+                )
             except:
                 return
-            if not member.can_manage_video_chats:
+            if not allowed:
                 return await message.reply(_["general_4"])
         return await mystic(client, message, _)
 
@@ -178,19 +177,17 @@ def ActualAdminCB(mystic):
         is_non_admin = await is_nonadmin_chat(CallbackQuery.message.chat.id)
         if not is_non_admin:
             try:
-                a = (
-                    await app.get_chat_member(
-                        CallbackQuery.message.chat.id,
-                        CallbackQuery.from_user.id,
-                    )
-                ).privileges
+                allowed = await admincache.can_manage(
+                    CallbackQuery.message.chat.id,
+                    CallbackQuery.from_user.id,
+                )
             except:
                 return await CallbackQuery.answer(_["general_4"], show_alert=True)
-            if not a.can_manage_video_chats:
+            if not allowed:
                 if CallbackQuery.from_user.id not in SUDOERS:
-                    token = await int_to_alpha(CallbackQuery.from_user.id)
-                    _check = await get_authuser_names(CallbackQuery.from_user.id)
-                    if token not in _check:
+                    if not await admincache.is_auth(
+                        CallbackQuery.message.chat.id, CallbackQuery.from_user.id
+                    ):
                         try:
                             return await CallbackQuery.answer(
                                 _["general_4"],
@@ -22,10 +22,9 @@ from Opus.utils.database import (
 )
 from Opus.utils.inline import botplaylist_markup
 from config import PLAYLIST_IMG_URL, SUPPORT_CHAT, adminlist
+from Opus.utils.assistantjoin import links
 from strings import get_string
 
-links = {}
-
 
 def UserbotWrapper(command):
     async def wrapper(client, message):
@@ -79,8 +78,8 @@ def UserbotWrapper(command):
                     invitelink = message.chat.username
                     await userbot.join_chat(invitelink)
                 else:
-                    if chat_id in links:
-                        invitelink = links[chat_id]
+                    if links.get(chat_id):
+                        invitelink = links.get(chat_id)
                         try:
                             await userbot.resolve_peer(invitelink)
                         except:
@@ -128,7 +127,7 @@ def UserbotWrapper(command):
                         f"{app.mention} **ᴀꜱꜱɪꜱᴛᴀɴᴛ ᴊᴏɪɴᴇᴅ ꜱᴜᴄᴄᴇꜱꜱꜰᴜʟʟʏ!** ✅"
                     )
 
-                links[chat_id] = invitelink
+                links.put(chat_id, invitelink)
 
                 try:
                     await userbot.resolve_peer(chat_id)
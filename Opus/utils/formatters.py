@@ -1,3 +1,4 @@
+import asyncio
 import json
 import subprocess
 
@@ -116,8 +117,8 @@ def speed_converter(seconds, speed):
     return "-"
 
 
-def check_duration(file_path):
-    command = [
+def _probe_command(file_path) -> list:
+    return [
         "ffprobe",
         "-loglevel",
         "quiet",
@@ -128,8 +129,8 @@ def check_duration(file_path):
         file_path,
     ]
 
-    pipe = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT)
-    out, err = pipe.communicate()
+
+def _parse_duration(out):
     _json = json.loads(out)
 
     if "format" in _json:
@@ -144,6 +145,25 @@ def check_duration(file_path):
     return "Unknown"
 
 
+def check_duration(file_path):
+    pipe = subprocess.Popen(
+        _probe_command(file_path), stdout=subprocess.PIPE, stderr=subprocess.STDOUT
+    )
+    out, err = pipe.communicate()
+    return _parse_duration(out)
+
+
+async def probe_duration(file_path):
+    """`check_duration` without tying up a thread while ffprobe runs."""
+    pipe = await asyncio.create_subprocess_exec(
+        *_probe_command(file_path),
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.STDOUT,
+    )
+    out, err = await pipe.communicate()
+    return _parse_duration(out)
+
+
 formats = [
     "webm",
     "mkv",
@@ -0,0 +1,173 @@
+import asyncio
+import time
+
+from pyrogram.errors import FloodWait
+
+import config
+from Opus import app
+from Opus.core.mongo import mongodb
+from Opus.core.ratelimit import BULK, current_priority
+from Opus.logging import LOGGER
+from Opus.utils.database import get_lang, get_served_chats
+from Opus.utils.formatters import get_readable_time
+from strings import get_string
+
+gbanjobsdb = mongodb.gbanjobs
+
+GBAN_CHUNK = 100
+GBAN_RETRIES = 3
+GBAN_PROGRESS_INTERVAL = 10
+
+# user_id -> running asyncio.Task
+jobs = {}
+
+
+class GbanJob:
+    def __init__(self, doc: dict):
+        self.doc = doc
+        self.id = doc["_id"]
+        self.sem = asyncio.Semaphore(config.GBAN_WORKERS)
+        self.mystic = None
+        self.done = 0
+
+    async def save(self, **fields):
+        self.doc.update(fields)
+        await gbanjobsdb.update_one({"_id": self.id}, {"$set": fields})
+
+    async def apply(self, chat_id: int):
+        async with self.sem:
+            for _ in range(GBAN_RETRIES):
+                try:
+                    if self.doc["action"] == "ban":
+                        await app.ban_chat_member(chat_id, self.doc["user_id"])
+                    else:
+                        await app.unban_chat_member(chat_id, self.doc["user_id"])
+                except FloodWait as fw:
+                    await asyncio.sleep(int(fw.value))
+                    continue
+                except Exception:
+                    break
+                self.doc["chats"] += 1
+                break
+            self.done += 1
+
+    def header(self, _) -> str:
+        key = "gban_5" if self.doc["action"] == "ban" else "gban_8"
+        left = self.doc["total"] - self.doc["processed"] - self.done
+        return _[key].format(self.doc["user_mention"], get_readable_time(left) or "0s")
+
+    async def report(self, _):
+        while True:
+            await asyncio.sleep(GBAN_PROGRESS_INTERVAL)
+            try:
+                await self.mystic.edit_text(
+                    self.header(_)
+                    + _["gban_13"].format(
+                        self.doc["processed"] + self.done,
+                        self.doc["total"],
+                        self.doc["chats"],
+                    )
+                )
+            except Exception:
+                pass
+
+    async def run(self):
+        _ = get_string(await get_lang(self.doc["chat_id"]))
+        ids = sorted(int(chat["chat_id"]) for chat in await get_served_chats())
+        cursor = self.doc.get("cursor")
+        if cursor is not None:
+            ids = [i for i in ids if i > cursor]
+        await self.save(total=self.doc["processed"] + len(ids))
+        self.mystic = await app.send_message(self.doc["chat_id"], self.header(_))
+        reporter = asyncio.create_task(self.report(_))
+        try:
+            for n in range(0, len(ids), GBAN_CHUNK):
+                chunk = ids[n : n + GBAN_CHUNK]
+                await asyncio.gather(*(self.apply(i) for i in chunk))
+                self.done = 0
+                await self.save(
+                    cursor=chunk[-1],
+                    processed=self.doc["processed"] + len(chunk),
+                    chats=self.doc["chats"],
+                )
+        finally:
+            reporter.cancel()
+        await self.save(state="done", finished=time.time())
+        if self.doc["action"] == "ban":
+            text = _["gban_6"].format(
+                app.mention,
+                self.doc["chat_title"],
+                self.doc["chat_id"],
+                self.doc["user_mention"],
+                self.doc["user_id"],
+                self.doc["by_mention"],
+                self.doc["chats"],
+            )
+        else:
+            text = _["gban_9"].format(self.doc["user_mention"], self.doc["chats"])
+        await app.send_message(self.doc["chat_id"], text)
+        try:
+            await self.mystic.delete()
+        except Exception:
+            pass
+
+
+async def _run_job(job: GbanJob):
+    current_priority.set(BULK)
+    try:
+        await job.run()
+    except asyncio.CancelledError:
+        await job.save(state="cancelled")
+        if job.mystic:
+            try:
+                await job.mystic.delete()
+            except Exception:
+                pass
+        raise
+    except Exception as e:
+        LOGGER(__name__).error(f"Gban job {job.id} stopped: {e}")
+
+
+def _spawn(job: GbanJob):
+    user_id = job.doc["user_id"]
+    old = jobs.get(user_id)
+    if old and not old.done():
+        old.cancel()
+    task = asyncio.create_task(_run_job(job))
+    jobs[user_id] = task
+    task.add_done_callback(
+        lambda t: jobs.pop(user_id, None) if jobs.get(user_id) is t else None
+    )
+    return task
+
+
+async def start_gban_job(
+    action: str,
+    user_id: int,
+    user_mention: str,
+    chat_id: int,
+    chat_title: str = None,
+    by_mention: str = None,
+):
+    doc = {
+        "_id": int(time.time() * 1000),
+        "state": "running",
+        "action": action,
+        "user_id": user_id,
+        "user_mention": user_mention,
+        "chat_id": chat_id,
+        "chat_title": chat_title,
+        "by_mention": by_mention,
+        "cursor": None,
+        "processed": 0,
+        "total": 0,
+        "chats": 0,
+        "created": time.time(),
+    }
+    await gbanjobsdb.insert_one(doc)
+    return _spawn(GbanJob(doc))
+
+
+async def resume_gban_jobs():
+    async for doc in gbanjobsdb.find({"state": "running"}).sort("_id", 1):
+        _spawn(GbanJob(doc))
@@ -0,0 +1,116 @@
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import config
+from Opus.logging import LOGGER
+
+
+def _noop():
+    return os.getpid()
+
+
+class ProcessPool:
+    """
+    Worker processes for CPU-bound work, so it runs outside the GIL the
+    event loop needs.
+
+    Work is submitted by task name; each task is a module-level function
+    registered with `task()` together with how many of it may run at
+    once. At most PROCESS_QUEUE submissions are admitted at a time, and
+    the rest wait on the caller's side. Workers are forked once at boot
+    (`start()`), before the Telegram clients start and before Mongo is
+    first used. The sync Mongo client is built with connect=False and Motor
+    defers connecting too, so neither has started monitor threads yet. That
+    keeps children from inheriting locks held by threads they lack. The
+    task modules are imported by then through Opus.core.call and the
+    platforms. If a worker dies the broken pool is shut down and a new one
+    is forked on the next submission.
+    """
+
+    def __init__(self, workers: int, queue: int):
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = None
+        self.slots = asyncio.Semaphore(queue)
+        # name -> (function, asyncio.Semaphore)
+        self.tasks = {}
+        self.metrics = {}
+
+    def task(self, name: str, limit: int = 1):
+        def decorator(func):
+            self.tasks[name] = (func, asyncio.Semaphore(limit))
+            self.metrics[name] = {
+                "done": 0,
+                "failed": 0,
+                "waiting": 0,
+                "running": 0,
+                "busy": 0.0,
+                "max_wait": 0.0,
+            }
+            return func
+
+        return decorator
+
+    def _executor(self) -> ProcessPoolExecutor:
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("fork"),
+            )
+        return self.executor
+
+    def start(self):
+        executor = self._executor()
+        for _ in range(self.workers):
+            executor.submit(_noop)
+        LOGGER(__name__).info(f"Started {self.workers} worker processes")
+
+    async def run(self, name: str, *args):
+        func, limit = self.tasks[name]
+        m = self.metrics[name]
+        m["waiting"] += 1
+        queued = time.monotonic()
+        admitted = False
+        try:
+            async with limit, self.slots:
+                admitted = True
+                started = time.monotonic()
+                m["waiting"] -= 1
+                m["max_wait"] = max(m["max_wait"], started - queued)
+                m["running"] += 1
+                executor = self._executor()
+                try:
+                    result = await asyncio.get_running_loop().run_in_executor(
+                        executor, func, *args
+                    )
+                except BrokenProcessPool:
+                    # Every task in flight fails with the same pool; only the
+                    # first one retires it, later ones must not stop its successor.
+                    if self.executor is executor:
+                        LOGGER(__name__).error("A worker process died, restarting the pool")
+                        self.close()
+                    raise
+                finally:
+                    m["running"] -= 1
+                    m["busy"] += time.monotonic() - started
+        except BaseException:
+            if not admitted:
+                m["waiting"] -= 1
+            m["failed"] += 1
+            raise
+        m["done"] += 1
+        return result
+
+    def stats(self) -> dict:
+        return self.metrics
+
+    def close(self):
+        if self.executor:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+
+procpool = ProcessPool(config.PROCESS_WORKERS, config.PROCESS_QUEUE)
@@ -0,0 +1,154 @@
+import asyncio
+import time
+from collections import deque
+
+from Opus.logging import LOGGER
+
+HEALTH_WINDOW = 50
+HEDGE_DEFAULT_DELAY = 8.0
+HEDGE_MIN_DELAY = 1.0
+
+
+class Backend:
+    """Rolling latency and success record for one download source."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.results = deque(maxlen=HEALTH_WINDOW)
+        self.latencies = deque(maxlen=HEALTH_WINDOW)
+        self.wins = 0
+        self.inflight = 0
+        self.last_error = None
+
+    def record(self, ok: bool, elapsed: float, error: Exception = None):
+        self.results.append(ok)
+        if ok:
+            self.latencies.append(elapsed)
+        else:
+            self.last_error = f"{type(error).__name__}: {error}" if error else None
+
+    def outrun(self, elapsed: float):
+        # Cancelled after another source won: the real latency is at least
+        # `elapsed`. Kept only when that can move the median, so a stalling
+        # source loses its place while a hedge cut short early does not
+        # look faster than it is.
+        if elapsed >= self.percentile(0.5):
+            self.latencies.append(elapsed)
+
+    def success_rate(self) -> float:
+        if not self.results:
+            return 1.0
+        return sum(self.results) / len(self.results)
+
+    def percentile(self, p: float) -> float:
+        if not self.latencies:
+            return HEDGE_DEFAULT_DELAY
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * p))]
+
+    def cost(self) -> float:
+        # Expected time to a usable file: typical latency inflated by failures.
+        return self.percentile(0.5) / max(self.success_rate(), 0.05)
+
+    def hedge_delay(self) -> float:
+        return max(HEDGE_MIN_DELAY, self.percentile(0.95))
+
+
+class SourceRacer:
+    """
+    Runs interchangeable sources best-first. If the running source has not
+    finished after its p95 latency, the next one is started alongside it;
+    the first success wins and the rest are cancelled.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.backends = {}
+
+    def backend(self, name: str) -> Backend:
+        if name not in self.backends:
+            self.backends[name] = Backend(name)
+        return self.backends[name]
+
+    async def _attempt(self, backend: Backend, fn):
+        started = time.monotonic()
+        backend.inflight += 1
+        try:
+            result = await fn()
+            if not result:
+                raise Exception("empty result")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            backend.record(False, time.monotonic() - started, e)
+            LOGGER(__name__).warning(f"{self.name}/{backend.name} failed: {e}")
+            raise
+        finally:
+            backend.inflight -= 1
+        backend.record(True, time.monotonic() - started)
+        return result
+
+    async def race(self, sources: dict):
+        order = sorted(sources, key=lambda n: self.backend(n).cost())
+        launched = []
+        pending = {}
+        started = {}
+        won = False
+
+        def launch():
+            name = order[len(launched)]
+            launched.append(name)
+            task = asyncio.create_task(self._attempt(self.backend(name), sources[name]))
+            pending[task] = name
+            started[task] = time.monotonic()
+
+        launch()
+        try:
+            while pending:
+                delay = None
+                if len(launched) < len(order):
+                    delay = self.backend(launched[-1]).hedge_delay()
+                done, _ = await asyncio.wait(
+                    pending, timeout=delay, return_when=asyncio.FIRST_COMPLETED
+                )
+                if not done:
+                    launch()
+                    continue
+                for task in done:
+                    name = pending.pop(task)
+                    if not task.exception():
+                        self.backend(name).wins += 1
+                        won = True
+                        return task.result()
+                if not pending and len(launched) < len(order):
+                    launch()
+            return None
+        finally:
+            now = time.monotonic()
+            for task, name in pending.items():
+                task.cancel()
+                if won:
+                    self.backend(name).outrun(now - started[task])
+
+    def stats(self) -> dict:
+        return {
+            name: {
+                "samples": len(b.results),
+                "success": b.success_rate(),
+                "p50": b.percentile(0.5) if b.latencies else None,
+                "p95": b.percentile(0.95) if b.latencies else None,
+                "wins": b.wins,
+                "inflight": b.inflight,
+                "last_error": b.last_error,
+            }
+            for name, b in self.backends.items()
+        }
+
+
+racers = {}
+
+
+def get_racer(name: str) -> SourceRacer:
+    if name not in racers:
+        racers[name] = SourceRacer(name)
+    return racers[name]
@@ -0,0 +1,100 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+import config
+from Opus.utils.database import get_active_chats, get_active_video_chats
+from Opus.utils.exceptions import AssistantErr
+
+# Seconds between capacity re-checks while nothing signals a free slot.
+ADMISSION_POLL = 5
+
+
+class Capacity:
+    """
+    How many calls this host may encode at once.
+
+    A call is admitted while the audio and video counts stay under
+    MAX_AUDIO_CALLS/MAX_VIDEO_CALLS and the weighted cost (one unit per
+    audio call, VIDEO_CALL_COST per video call) stays within CALL_CAPACITY.
+    A zero limit disables that check. Requests that do not fit wait in
+    arrival order.
+    """
+
+    def __init__(self):
+        # chat_id -> video flag, admitted but not yet in the active lists
+        self.reserved = {}
+        # one ticket per request waiting for room, oldest first
+        self.waiting = []
+        self.changed = asyncio.Event()
+
+    async def load(self) -> tuple:
+        calls = await get_active_chats()
+        videos = len(await get_active_video_chats())
+        reserved = [v for c, v in self.reserved.items() if c not in calls]
+        videos += sum(1 for v in reserved if v)
+        audios = len(calls) + len(reserved) - videos
+        return audios, videos
+
+    async def fits(self, video: bool) -> bool:
+        audios, videos = await self.load()
+        if video and config.MAX_VIDEO_CALLS and videos >= config.MAX_VIDEO_CALLS:
+            return False
+        if not video and config.MAX_AUDIO_CALLS and audios >= config.MAX_AUDIO_CALLS:
+            return False
+        if config.CALL_CAPACITY:
+            cost = audios + videos * config.VIDEO_CALL_COST
+            cost += config.VIDEO_CALL_COST if video else 1
+            if cost > config.CALL_CAPACITY:
+                return False
+        return True
+
+    def release(self):
+        """Wake waiting requests after a call ended or a slot was given back."""
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+    async def _wait(self, _, mystic, video: bool):
+        ticket = object()
+        self.waiting.append(ticket)
+        deadline = time.monotonic() + config.ADMISSION_TIMEOUT
+        shown = None
+        try:
+            while True:
+                changed = self.changed
+                if self.waiting[0] is ticket and await self.fits(video):
+                    return
+                position = self.waiting.index(ticket) + 1
+                if position != shown:
+                    shown = position
+                    try:
+                        await mystic.edit_text(_["call_11"].format(position))
+                    except Exception:
+                        pass
+                left = deadline - time.monotonic()
+                if left <= 0:
+                    raise AssistantErr(_["call_12"])
+                try:
+                    await asyncio.wait_for(changed.wait(), min(ADMISSION_POLL, left))
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            self.waiting.remove(ticket)
+            self.release()
+
+    @asynccontextmanager
+    async def slot(self, _, mystic, chat_id: int, video: bool):
+        if self.waiting or not await self.fits(video):
+            await self._wait(_, mystic, video)
+        self.reserved[chat_id] = bool(video)
+        try:
+            yield
+        finally:
+            self.reserved.pop(chat_id, None)
+            self.release()
+
+    def stats(self) -> dict:
+        return {"reserved": len(self.reserved), "waiting": len(self.waiting)}
+
+
+capacity = Capacity()
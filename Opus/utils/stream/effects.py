@@ -0,0 +1,76 @@
+# chat_id -> {"pitch": semitones, "bass": dB, "normalize": bool}
+effects = {}
+
+DEFAULT_EFFECTS = {"pitch": 0, "bass": 0, "normalize": False}
+PITCH_RANGE = (-12, 12)
+BASS_RANGE = (0, 20)
+SAMPLE_RATE = 48000
+
+
+def get_effects(chat_id: int) -> dict:
+    return dict(DEFAULT_EFFECTS, **effects.get(chat_id, {}))
+
+
+def set_effect(chat_id: int, name: str, value):
+    state = effects.setdefault(chat_id, {})
+    if value == DEFAULT_EFFECTS[name]:
+        state.pop(name, None)
+    else:
+        state[name] = value
+    if not state:
+        effects.pop(chat_id, None)
+
+
+def clear_effects(chat_id: int):
+    effects.pop(chat_id, None)
+
+
+def _atempo(factor: float) -> list:
+    # Keep every stage inside the 0.5-2.0 range older ffmpeg builds accept.
+    stages = []
+    while factor > 2.0:
+        stages.append("atempo=2.0")
+        factor /= 2.0
+    while factor < 0.5:
+        stages.append("atempo=0.5")
+        factor /= 0.5
+    if abs(factor - 1.0) > 1e-4:
+        stages.append(f"atempo={factor:.5f}")
+    return stages
+
+
+def audio_filters(chat_id: int, speed: float = 1.0, gain: float = None) -> str:
+    state = get_effects(chat_id)
+    chain = []
+    if gain:
+        chain.append(f"volume={gain}dB")
+    if state["pitch"]:
+        factor = 2 ** (state["pitch"] / 12)
+        chain += [
+            f"aresample={SAMPLE_RATE}",
+            f"asetrate={SAMPLE_RATE * factor:.0f}",
+            f"aresample={SAMPLE_RATE}",
+        ]
+        chain += _atempo(float(speed) / factor)
+    else:
+        chain += _atempo(float(speed))
+    if state["bass"]:
+        chain.append(f"bass=g={state['bass']}")
+    if state["normalize"]:
+        chain.append("dynaudnorm=f=150:g=15")
+    return ",".join(chain)
+
+
+def effect_parameters(
+    chat_id: int, speed: float = 1.0, params: str = None, gain: float = None
+) -> str:
+    """
+    FFmpeg parameters for a MediaStream: `params` (e.g. a seek range)
+    followed by the track gain and the chat's live audio filters. `-atend`
+    makes py-tgcalls place the filters after the input, where they act on
+    the output.
+    """
+    chain = audio_filters(chat_id, speed, gain)
+    if not chain:
+        return params
+    return f"{params or ''} -atend -filter:a {chain}".strip()
@@ -0,0 +1,109 @@
+import asyncio
+import os
+import re
+
+import config
+from Opus.core.mongo import mongodb
+from Opus.logging import LOGGER
+
+loudnessdb = mongodb.loudness
+
+MAX_GAIN = 12.0
+PEAK_CEILING = -1.0
+LOUDNESS_CACHE_SIZE = 20000
+
+analysis_slots = asyncio.Semaphore(config.LOUDNESS_WORKERS)
+# (file name, size) -> gain in dB
+gains = {}
+# (file name, size) -> running analysis
+analysing = {}
+
+
+def _key(path: str):
+    try:
+        return os.path.basename(path), os.path.getsize(path)
+    except OSError:
+        return None
+
+
+def _gain(lufs: float, peak: float) -> float:
+    gain = config.LOUDNESS_TARGET - lufs
+    if peak is not None:
+        gain = min(gain, PEAK_CEILING - peak)
+    return round(max(-MAX_GAIN, min(MAX_GAIN, gain)), 1)
+
+
+async def _measure(path: str):
+    async with analysis_slots:
+        proc = await asyncio.create_subprocess_exec(
+            "ffmpeg",
+            "-hide_banner",
+            "-nostats",
+            "-i",
+            path,
+            "-vn",
+            "-af",
+            "ebur128=peak=true",
+            "-f",
+            "null",
+            "-",
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        _, err = await proc.communicate()
+    summary = err.decode(errors="ignore").rsplit("Summary:", 1)[-1]
+    lufs = re.search(r"I:\s+(-?[\d.]+) LUFS", summary)
+    if proc.returncode != 0 or not lufs:
+        raise Exception(f"ebur128 failed for {os.path.basename(path)}")
+    peak = re.search(r"Peak:\s+(-?[\d.]+) dBFS", summary)
+    return float(lufs.group(1)), float(peak.group(1)) if peak else None
+
+
+async def _analyse(path: str, key):
+    doc = await loudnessdb.find_one({"_id": f"{key[0]}:{key[1]}"})
+    if doc:
+        lufs, peak = doc["lufs"], doc.get("peak")
+    else:
+        lufs, peak = await _measure(path)
+        await loudnessdb.update_one(
+            {"_id": f"{key[0]}:{key[1]}"},
+            {"$set": {"lufs": lufs, "peak": peak}},
+            upsert=True,
+        )
+    if len(gains) >= LOUDNESS_CACHE_SIZE:
+        gains.clear()
+    gains[key] = _gain(lufs, peak)
+    return gains[key]
+
+
+def _done(task: asyncio.Task):
+    if not task.cancelled() and task.exception():
+        LOGGER(__name__).warning(f"Loudness analysis failed: {task.exception()}")
+
+
+def analyse(path: str):
+    """Queue an EBU R128 measurement of `path` unless it is known or running."""
+    if not config.LOUDNESS_NORMALIZE or not path or not os.path.isfile(path):
+        return
+    key = _key(path)
+    if key is None or key in gains or key in analysing:
+        return
+    task = asyncio.create_task(_analyse(path, key))
+    analysing[key] = task
+    task.add_done_callback(lambda t: analysing.pop(key, None))
+    task.add_done_callback(_done)
+
+
+def track_gain(path) -> float:
+    """
+    Gain in dB that brings `path` to LOUDNESS_TARGET, or None if it has not
+    been measured yet (a measurement is queued for next time).
+    """
+    if not config.LOUDNESS_NORMALIZE or not path or not os.path.isfile(str(path)):
+        return None
+    key = _key(path)
+    if key in gains:
+        return gains[key]
+    analyse(path)
+    return None
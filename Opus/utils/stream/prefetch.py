@@ -0,0 +1,91 @@
+import asyncio
+
+import config
+from Opus import YouTube
+from Opus.logging import LOGGER
+from Opus.misc import db
+from Opus.utils.stream.loudness import analyse
+
+# chat_id -> {(videoid, video): asyncio.Task}
+prefetched = {}
+
+
+def _key(entry: dict):
+    return entry["vidid"], str(entry["streamtype"]) == "video"
+
+
+def _upcoming(chat_id: int) -> list:
+    check = db.get(chat_id) or []
+    keys = []
+    for entry in check[1:]:
+        if len(keys) >= config.PREFETCH_TRACKS:
+            break
+        if "vid_" not in entry["file"]:
+            analyse(entry["file"])
+            continue
+        key = _key(entry)
+        if key not in keys:
+            keys.append(key)
+    return keys
+
+
+async def _download(videoid: str, video: bool):
+    file_path, _ = await YouTube.download(videoid, None, videoid=True, video=video)
+    analyse(file_path)
+    return file_path
+
+
+def _done(task: asyncio.Task):
+    if task.cancelled():
+        return
+    if task.exception():
+        LOGGER(__name__).warning(f"Prefetch failed: {task.exception()}")
+
+
+def prefetch(chat_id: int):
+    """
+    Bring the background downloads for `chat_id` in line with its queue:
+    start the next PREFETCH_TRACKS `vid_` entries and drop anything that
+    is no longer coming up (skip, shuffle, removal).
+    """
+    wanted = _upcoming(chat_id)
+    tasks = prefetched.setdefault(chat_id, {})
+    for key in [k for k in tasks if k not in wanted]:
+        tasks.pop(key).cancel()
+    for key in wanted:
+        if key not in tasks:
+            task = asyncio.create_task(_download(*key))
+            task.add_done_callback(_done)
+            tasks[key] = task
+    if not tasks:
+        prefetched.pop(chat_id, None)
+
+
+def should_prefetch(entry: dict) -> bool:
+    seconds = int(entry.get("seconds") or 0)
+    if seconds == 0:
+        return False
+    return entry.get("played", 0) * 100 >= seconds * config.PREFETCH_AT
+
+
+async def take_prefetched(chat_id: int, videoid: str, video: bool):
+    """
+    Return the local path prefetched for this track, waiting for a download
+    that is still running, or None if it was never started or failed.
+    """
+    task = prefetched.get(chat_id, {}).pop((videoid, bool(video)), None)
+    if not task:
+        return None
+    try:
+        return await task
+    except asyncio.CancelledError:
+        if task.cancelled():
+            return None
+        raise
+    except Exception:
+        return None
+
+
+def cancel_prefetch(chat_id: int):
+    for task in prefetched.pop(chat_id, {}).values():
+        task.cancel()
@@ -0,0 +1,125 @@
+import asyncio
+
+import psutil
+from pytgcalls.types import AudioQuality, VideoQuality
+
+import config
+from Opus.logging import LOGGER
+from Opus.utils.database import (
+    AUDIO_QUALITIES,
+    VIDEO_QUALITIES,
+    get_active_chats,
+    get_active_video_chats,
+    get_aud_bit_name,
+    get_vid_bit_name,
+)
+
+# Weight of the newest CPU sample in the moving average.
+SMOOTHING = 0.3
+# Consecutive samples past a limit before the controller acts.
+PATIENCE = 3
+
+
+def _lower(levels: tuple, name: str, steps: int) -> str:
+    return levels[min(levels.index(name) + steps, len(levels) - 1)]
+
+
+class QualityController:
+    """
+    Steps stream quality down while the host is saturated and back up once
+    there is headroom. Video tiers go first on the way down and come back
+    last; audio is the opposite. New streams and track changes pick up the
+    current tiers, so running calls converge within a track.
+    """
+
+    def __init__(self):
+        self.process = psutil.Process()
+        self.cpus = psutil.cpu_count() or 1
+        self.host = 0.0
+        self.own = 0.0
+        self.video_steps = 0
+        self.audio_steps = 0
+        self.hot = 0
+        self.cool = 0
+
+    def sample(self):
+        host = psutil.cpu_percent(interval=None)
+        own = self.process.cpu_percent(interval=None) / self.cpus
+        self.host += SMOOTHING * (host - self.host)
+        self.own += SMOOTHING * (own - self.own)
+
+    def _log(self, action: str, calls: int, videos: int):
+        LOGGER(__name__).info(
+            f"Quality {action}: host {self.host:.0f}%, bot {self.own:.0f}%, "
+            f"{calls} calls ({videos} video) -> video -{self.video_steps}, "
+            f"audio -{self.audio_steps}"
+        )
+
+    def decide(self, calls: int, videos: int):
+        if self.host >= config.QUALITY_CPU_LIMIT:
+            self.hot += 1
+            self.cool = 0
+        elif self.host <= config.QUALITY_CPU_RESUME:
+            self.cool += 1
+            self.hot = 0
+        else:
+            self.hot = self.cool = 0
+        if self.hot >= PATIENCE:
+            self.hot = 0
+            if videos and self.video_steps < len(VIDEO_QUALITIES) - 1:
+                self.video_steps += 1
+            elif self.audio_steps < len(AUDIO_QUALITIES) - 1:
+                self.audio_steps += 1
+            else:
+                return
+            self._log("down", calls, videos)
+        elif self.cool >= PATIENCE:
+            self.cool = 0
+            if self.audio_steps:
+                self.audio_steps -= 1
+            elif self.video_steps:
+                self.video_steps -= 1
+            else:
+                return
+            self._log("up", calls, videos)
+
+    async def run(self):
+        self.process.cpu_percent(interval=None)
+        psutil.cpu_percent(interval=None)
+        while not await asyncio.sleep(config.QUALITY_INTERVAL):
+            try:
+                self.sample()
+                self.decide(
+                    len(await get_active_chats()),
+                    len(await get_active_video_chats()),
+                )
+            except Exception as e:
+                LOGGER(__name__).warning(f"Quality controller: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "host": self.host,
+            "own": self.own,
+            "video_steps": self.video_steps,
+            "audio_steps": self.audio_steps,
+        }
+
+
+controller = QualityController()
+
+
+async def stream_quality(chat_id: int) -> tuple:
+    """
+    The chat's audio and video quality lowered by the controller's current
+    tiers, plus one video tier while too many video calls are running.
+    """
+    crowded = int(len(await get_active_video_chats()) >= config.QUALITY_VIDEO_LIMIT)
+    audio = _lower(
+        AUDIO_QUALITIES, await get_aud_bit_name(chat_id), controller.audio_steps
+    )
+    video = _lower(
+        VIDEO_QUALITIES,
+        await get_vid_bit_name(chat_id),
+        controller.video_steps + crowded,
+    )
+    return getattr(AudioQuality, audio), getattr(VideoQuality, video)
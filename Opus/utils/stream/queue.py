@@ -1,8 +1,7 @@
-import asyncio
 from typing import Union
 
 from Opus.misc import db
-from Opus.utils.formatters import check_duration, seconds_to_min
+from Opus.utils.formatters import probe_duration, seconds_to_min
 from config import autoclean, time_to_seconds
 
 
@@ -60,9 +59,7 @@ async def put_queue_index(
 ):
     if "20.212.146.162" in vidid:
         try:
-            dur = await asyncio.get_event_loop().run_in_executor(
-                None, check_duration, vidid
-            )
+            dur = await probe_duration(vidid)
             duration = seconds_to_min(dur)
         except:
             duration = "ᴜʀʟ sᴛʀᴇᴀᴍ"
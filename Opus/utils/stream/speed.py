@@ -0,0 +1,118 @@
+import asyncio
+import os
+import time
+import uuid
+
+import config
+from Opus.logging import LOGGER
+from Opus.misc import db
+
+PLAYBACK_DIR = os.path.join(os.getcwd(), "playback")
+
+render_slots = asyncio.Semaphore(config.SPEED_WORKERS)
+# output path -> running render, shared by every chat asking for it
+rendering = {}
+
+
+def variant_path(file_path: str, speed) -> str:
+    return os.path.join(PLAYBACK_DIR, str(speed), os.path.basename(file_path))
+
+
+def _in_use() -> set:
+    paths = set()
+    for queue in list(db.values()):
+        if queue and queue[0].get("speed_path"):
+            paths.add(queue[0]["speed_path"])
+    return paths
+
+
+def evict_playback():
+    """Drop least recently used variants until PLAYBACK_CACHE_MB is met."""
+    limit = config.PLAYBACK_CACHE_MB * 1024 * 1024
+    files = []
+    total = 0
+    for root, _, names in os.walk(PLAYBACK_DIR):
+        for name in names:
+            if name.startswith("part_"):
+                continue
+            path = os.path.join(root, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            files.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+    if total <= limit:
+        return
+    busy = _in_use() | set(rendering)
+    for _, size, path in sorted(files):
+        if total <= limit:
+            break
+        if path in busy:
+            continue
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+
+
+async def _render(file_path: str, speed, out: str) -> str:
+    os.makedirs(os.path.dirname(out), exist_ok=True)
+    part = os.path.join(
+        os.path.dirname(out), f"part_{uuid.uuid4().hex[:8]}_{os.path.basename(out)}"
+    )
+    cmd = [
+        "ffmpeg",
+        "-y",
+        "-loglevel",
+        "error",
+        "-i",
+        file_path,
+        "-filter:v",
+        f"setpts={1 / float(speed):.4f}*PTS",
+        "-filter:a",
+        f"atempo={speed}",
+        part,
+    ]
+    started = time.monotonic()
+    async with render_slots:
+        proc = await asyncio.create_subprocess_exec(
+            *cmd,
+            stdin=asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.DEVNULL,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        _, err = await proc.communicate()
+    if proc.returncode != 0 or not os.path.isfile(part):
+        try:
+            os.remove(part)
+        except OSError:
+            pass
+        raise Exception(f"ffmpeg failed: {err.decode(errors='ignore')[-200:]}")
+    os.replace(part, out)
+    LOGGER(__name__).info(
+        f"Rendered {os.path.basename(out)} at {speed}x in {time.monotonic() - started:.1f}s"
+    )
+    await asyncio.get_running_loop().run_in_executor(None, evict_playback)
+    return out
+
+
+async def speed_variant(file_path: str, speed) -> str:
+    """
+    Path of `file_path` re-timed to `speed`, rendering it once if needed.
+    Chats asking for the same variant share one ffmpeg run, and renders
+    are capped at SPEED_WORKERS.
+    """
+    if str(speed) == "1.0":
+        return file_path
+    out = variant_path(file_path, speed)
+    if os.path.isfile(out):
+        os.utime(out)
+        return out
+    task = rendering.get(out)
+    if not task:
+        task = asyncio.ensure_future(_render(file_path, speed, out))
+        rendering[out] = task
+        task.add_done_callback(lambda _: rendering.pop(out, None))
+    return await asyncio.shield(task)
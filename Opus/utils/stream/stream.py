@@ -12,6 +12,7 @@ from Opus.utils.database import add_active_video_chat, is_active_chat
 from Opus.utils.exceptions import AssistantErr
 from Opus.utils.inline import aq_markup, close_markup, stream_markup
 from Opus.utils.pastebin import AnonyBin
+from Opus.utils.stream.capacity import capacity
 from Opus.utils.stream.queue import put_queue, put_queue_index
 from Opus.utils.thumbnails import get_thumb
 
@@ -28,6 +29,31 @@ async def stream(
     streamtype: Union[bool, str] = None,
     spotify: Union[bool, str] = None,
     forceplay: Union[bool, str] = None,
+):
+    args = (_, mystic, user_id, result, chat_id, user_name, original_chat_id)
+    kwargs = dict(
+        video=video, streamtype=streamtype, spotify=spotify, forceplay=forceplay
+    )
+    # A forceplay in a running call replaces its track; in an idle chat it
+    # starts a new call and needs a slot like any other.
+    if not result or await is_active_chat(chat_id):
+        return await _stream(*args, **kwargs)
+    async with capacity.slot(_, mystic, chat_id, bool(video)):
+        return await _stream(*args, **kwargs)
+
+
+async def _stream(
+    _,
+    mystic,
+    user_id,
+    result,
+    chat_id,
+    user_name,
+    original_chat_id,
+    video: Union[bool, str] = None,
+    streamtype: Union[bool, str] = None,
+    spotify: Union[bool, str] = None,
+    forceplay: Union[bool, str] = None,
 ):
     if not result:
         return
@@ -0,0 +1,178 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import yt_dlp
+
+import config
+from Opus.utils.cookies import cookies
+from Opus.utils.procpool import procpool
+
+YTDL_MAX_USES = 200
+
+BASE_OPTS = {
+    "quiet": True,
+    "no_warnings": True,
+    "geo_bypass": True,
+    "nocheckcertificate": True,
+}
+
+PROFILES = {
+    "default": {},
+    "mp3": {
+        "prefer_ffmpeg": True,
+        "postprocessors": [
+            {
+                "key": "FFmpegExtractAudio",
+                "preferredcodec": "mp3",
+                "preferredquality": "192",
+            }
+        ],
+    },
+}
+
+_MISSING = object()
+_SELECTOR = object()
+
+# (cookie file, version) -> [YoutubeDL, uses], per worker process
+_extractors = {}
+
+
+def _selector(ydl, fmt):
+    # Mirrors YoutubeDL.__init__, the only place the selector is built.
+    if fmt in (None, "-") or callable(fmt):
+        return fmt
+    return ydl.build_format_selector(fmt)
+
+
+def _apply(ydl, overrides: dict) -> dict:
+    saved = {k: ydl.params.get(k, _MISSING) for k in overrides}
+    if "format" in overrides:
+        saved[_SELECTOR] = ydl.format_selector
+        ydl.format_selector = _selector(ydl, overrides["format"])
+    ydl.params.update(overrides)
+    return saved
+
+
+def _restore(ydl, saved: dict):
+    selector = saved.pop(_SELECTOR, _MISSING)
+    if selector is not _MISSING:
+        ydl.format_selector = selector
+    for k, v in saved.items():
+        if v is _MISSING:
+            ydl.params.pop(k, None)
+        else:
+            ydl.params[k] = v
+
+
+@procpool.task("ytdl", config.YTDL_WORKERS)
+def extract_info(link: str, cookiefile: str, version, overrides: dict) -> dict:
+    """Metadata extraction, run in a worker process with its own warm instances."""
+    key = (cookiefile, version)
+    for stale in [k for k in _extractors if k[0] == cookiefile and k != key]:
+        _extractors.pop(stale)
+    entry = _extractors.get(key)
+    if not entry or entry[1] >= YTDL_MAX_USES:
+        opts = dict(BASE_OPTS)
+        if cookiefile:
+            opts["cookiefile"] = cookiefile
+        entry = _extractors[key] = [yt_dlp.YoutubeDL(opts), 0]
+    ydl = entry[0]
+    entry[1] += 1
+    saved = _apply(ydl, overrides)
+    try:
+        return ydl.sanitize_info(ydl.extract_info(link, download=False))
+    finally:
+        _restore(ydl, saved)
+
+
+class YTDLPool:
+    """
+    Warm `YoutubeDL` instances shared by every download. Metadata-only
+    extraction goes through the process pool instead (`extract_info`).
+
+    Instances are keyed by (profile, cookie file, file version), since
+    postprocessors and cookies are bound when the object is built.
+    Everything else (output template, playlist options) is applied per
+    call on `params` and restored afterwards; a per-call format also swaps
+    in a freshly built `format_selector`, since yt-dlp only builds it in
+    `__init__`. Each instance is dropped after YTDL_MAX_USES runs,
+    or once its cookie file has been replaced. Every run is reported to the
+    cookie pool.
+    """
+
+    def __init__(self, workers: int):
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="ytdl"
+        )
+        self.idle = {}
+        self.lock = threading.Lock()
+
+    def _acquire(self, key):
+        with self.lock:
+            idle = self.idle.get(key)
+            if idle:
+                return idle.pop()
+        profile, cookiefile, _ = key
+        opts = dict(BASE_OPTS, **PROFILES[profile])
+        if cookiefile:
+            opts["cookiefile"] = cookiefile
+        return yt_dlp.YoutubeDL(opts), 0
+
+    def _release(self, key, ydl, uses: int):
+        profile, cookiefile, version = key
+        if uses >= YTDL_MAX_USES or (cookiefile and version != cookies.version(cookiefile)):
+            # Just drop it: close() writes the cookie jar back to the file,
+            # which would look like a replaced cookie file.
+            return
+        with self.lock:
+            self.idle.setdefault(key, []).append((ydl, uses))
+
+    def _call(self, fn, profile: str, cookiefile: str, overrides: dict):
+        key = (profile, cookiefile, cookies.version(cookiefile))
+        ydl, uses = self._acquire(key)
+        saved = _apply(ydl, overrides)
+        try:
+            return fn(ydl)
+        finally:
+            _restore(ydl, saved)
+            self._release(key, ydl, uses + 1)
+
+    async def _reported(self, cookiefile: str, call):
+        try:
+            result = await call
+        except Exception as e:
+            if cookiefile:
+                cookies.report(cookiefile, e)
+            raise
+        if cookiefile:
+            cookies.report(cookiefile)
+        return result
+
+    async def run(self, fn, profile: str = "default", cookiefile: str = None, **overrides):
+        if "outtmpl" in overrides and not isinstance(overrides["outtmpl"], dict):
+            overrides["outtmpl"] = {"default": overrides["outtmpl"]}
+        loop = asyncio.get_running_loop()
+        return await self._reported(
+            cookiefile,
+            loop.run_in_executor(
+                self.executor, self._call, fn, profile, cookiefile, overrides
+            ),
+        )
+
+    async def extract(self, link: str, cookiefile: str = None, **overrides):
+        """Metadata only; runs in the process pool since parsing is CPU-bound."""
+        return await self._reported(
+            cookiefile,
+            procpool.run(
+                "ytdl", link, cookiefile, cookies.version(cookiefile), overrides
+            ),
+        )
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+        with self.lock:
+            self.idle.clear()
+
+
+ytdl = YTDLPool(config.YTDL_WORKERS)
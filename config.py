@@ -20,6 +20,44 @@ PLAYLIST_FETCH_LIMIT = int(getenv("PLAYLIST_FETCH_LIMIT", 70))
 TG_AUDIO_FILESIZE_LIMIT = int(getenv("TG_AUDIO_FILESIZE_LIMIT", 104857600))
 TG_VIDEO_FILESIZE_LIMIT = int(getenv("TG_VIDEO_FILESIZE_LIMIT", 1073741824))
 
+BROADCAST_WORKERS = int(getenv("BROADCAST_WORKERS", 8))
+BROADCAST_RATE = float(getenv("BROADCAST_RATE", 25))
+GBAN_WORKERS = int(getenv("GBAN_WORKERS", 5))
+OUTBOUND_RATE = float(getenv("OUTBOUND_RATE", 28))
+ASSISTANT_OUTBOUND_RATE = float(getenv("ASSISTANT_OUTBOUND_RATE", 10))
+OUTBOUND_CHAT_RATE = float(getenv("OUTBOUND_CHAT_RATE", 1))
+OUTBOUND_CHAT_BURST = int(getenv("OUTBOUND_CHAT_BURST", 5))
+PREFETCH_AT = int(getenv("PREFETCH_AT", 50))
+PREFETCH_TRACKS = int(getenv("PREFETCH_TRACKS", 1))
+YTDL_WORKERS = int(getenv("YTDL_WORKERS", 4))
+HTTP_LIMIT = int(getenv("HTTP_LIMIT", 100))
+HTTP_LIMIT_PER_HOST = int(getenv("HTTP_LIMIT_PER_HOST", 10))
+SPEED_WORKERS = int(getenv("SPEED_WORKERS", 2))
+PLAYBACK_CACHE_MB = int(getenv("PLAYBACK_CACHE_MB", 2048))
+LOUDNESS_NORMALIZE = str(getenv("LOUDNESS_NORMALIZE", "False")).lower() in ("true", "1")
+LOUDNESS_TARGET = float(getenv("LOUDNESS_TARGET", -16))
+LOUDNESS_WORKERS = int(getenv("LOUDNESS_WORKERS", 1))
+AUDIO_QUALITY = getenv("AUDIO_QUALITY", "STUDIO")
+VIDEO_QUALITY = getenv("VIDEO_QUALITY", "SD_480p")
+QUALITY_CPU_LIMIT = int(getenv("QUALITY_CPU_LIMIT", 80))
+QUALITY_CPU_RESUME = int(getenv("QUALITY_CPU_RESUME", 60))
+QUALITY_INTERVAL = int(getenv("QUALITY_INTERVAL", 10))
+MAX_AUDIO_CALLS = int(getenv("MAX_AUDIO_CALLS", 0))
+MAX_VIDEO_CALLS = int(getenv("MAX_VIDEO_CALLS", 0))
+CALL_CAPACITY = int(getenv("CALL_CAPACITY", 0))
+VIDEO_CALL_COST = int(getenv("VIDEO_CALL_COST", 5))
+ADMISSION_TIMEOUT = int(getenv("ADMISSION_TIMEOUT", 600))
+SHARD_ROLE = getenv("SHARD_ROLE", None)
+SHARD_ID = getenv("SHARD_ID", "0")
+SHARD_URL = getenv("SHARD_URL", None)
+SHARD_ASSISTANTS = getenv("SHARD_ASSISTANTS", None)
+PROCESS_WORKERS = int(getenv("PROCESS_WORKERS", 0))
+PROCESS_QUEUE = int(getenv("PROCESS_QUEUE", 64))
+UVLOOP = str(getenv("UVLOOP", "True")).lower() in ("true", "1")
+LOOP_LAG_INTERVAL = float(getenv("LOOP_LAG_INTERVAL", 0.5))
+LOOP_LAG_THRESHOLD = int(getenv("LOOP_LAG_THRESHOLD", 250))
+QUALITY_VIDEO_LIMIT = int(getenv("QUALITY_VIDEO_LIMIT", 20))
+
 HEROKU_APP_NAME = getenv("HEROKU_APP_NAME")
 HEROKU_API_KEY = getenv("HEROKU_API_KEY")
 